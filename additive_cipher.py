@@ -1,4 +1,4 @@
-import string
+from classical_engine import additive_table
 
 def clean_text(text):
     """Remove spaces and convert to uppercase"""
@@ -12,18 +12,9 @@ def additive_encrypt(plaintext, key):
     key = 3
     Result: "KHOOR"
     """
-    alphabet = string.ascii_uppercase
     plaintext = clean_text(plaintext)
-    ciphertext = ''
-    
-    for char in plaintext:
-        if char in alphabet:
-            # Shift the character by key positions
-            idx = (alphabet.index(char) + key) % 26
-            ciphertext += alphabet[idx]
-        else:
-            ciphertext += char
-    return ciphertext
+    # Shift every letter by key positions using a cached translation table
+    return plaintext.translate(additive_table(key))
 
 def additive_decrypt(ciphertext, key):
     """Decrypt by shifting in opposite direction"""
@@ -1,8 +1,21 @@
 from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
+from Crypto.Util.Padding import unpad
 from Crypto.Random import get_random_bytes
 import binascii
 import time
+from block_cipher_utils import CipherContext, pool_for, readinto_full
+from aes_container import CHUNK_SIZE, ContainerReader, create_container
+from parallel_aes import (parallel_ctr_encrypt_file, parallel_ctr_decrypt_file,
+                          parallel_cbc_decrypt_file)
+
+# Bytes read and encrypted per step by the stream/file methods (a multiple of
+# the AES block size); one buffer of this size is reused for the whole stream
+BUFFER_SIZE = 1 << 20
+
+# Modes supported by the stream/file methods, with the IV/nonce length stored
+# at the start of an encrypted file
+STREAM_MODES = {'cbc': AES.block_size, 'ctr': 8}
+
 
 class AESCipher:
     def __init__(self, key_size=128):
@@ -11,6 +24,7 @@ class AESCipher:
             raise ValueError("Key size must be 128, 192, or 256 bits")
         self.key_size = key_size
         self.key = None
+        self._pool = None
 
     def set_key(self, key):
         """Set the encryption key"""
@@ -24,48 +38,187 @@ class AESCipher:
         self.key = get_random_bytes(self.key_size // 8)
         return self.key
 
+    def _contexts(self):
+        """Pool of reusable cipher contexts for the current key"""
+        self._pool = pool_for(self._pool, AES, self.key)
+        return self._pool
+
+    # Binary API: any buffer-protocol input (bytes, bytearray, memoryview,
+    # mmap); with output=, results go into that writable buffer and the byte
+    # count is returned instead of bytes
+    def encrypt_ecb_bytes(self, data, output=None):
+        """Encrypt bytes using AES in ECB mode (PKCS#7 padded)"""
+        return self._contexts().run(CipherContext.encrypt_ecb, data, output)
+
+    def decrypt_ecb_bytes(self, data, output=None):
+        """Decrypt bytes using AES in ECB mode"""
+        return self._contexts().run(CipherContext.decrypt_ecb, data, output)
+
+    def encrypt_cbc_bytes(self, data, iv, output=None):
+        """Encrypt bytes using AES in CBC mode (PKCS#7 padded)"""
+        return self._contexts().run(CipherContext.encrypt_cbc, data, iv, output)
+
+    def decrypt_cbc_bytes(self, data, iv, output=None):
+        """Decrypt bytes using AES in CBC mode"""
+        return self._contexts().run(CipherContext.decrypt_cbc, data, iv, output)
+
+    def encrypt_ctr_bytes(self, data, nonce, output=None):
+        """Encrypt bytes using AES in CTR mode"""
+        return self._contexts().run(CipherContext.ctr, data, nonce, output)
+
+    def decrypt_ctr_bytes(self, data, nonce, output=None):
+        """Decrypt bytes using AES in CTR mode"""
+        return self._contexts().run(CipherContext.ctr, data, nonce, output)
+
+    # String API: text in, hex out (wrappers over the binary API)
     def encrypt_ecb(self, plaintext):
         """Encrypt using AES in ECB mode"""
-        cipher = AES.new(self.key, AES.MODE_ECB)
-        padded_text = pad(plaintext.encode(), AES.block_size)
-        encrypted_text = cipher.encrypt(padded_text)
-        return binascii.hexlify(encrypted_text).decode('utf-8')
+        return binascii.hexlify(self.encrypt_ecb_bytes(plaintext.encode())).decode('utf-8')
 
     def decrypt_ecb(self, ciphertext):
         """Decrypt using AES in ECB mode"""
-        cipher = AES.new(self.key, AES.MODE_ECB)
-        encrypted_data = binascii.unhexlify(ciphertext)
-        decrypted_data = cipher.decrypt(encrypted_data)
-        unpadded_text = unpad(decrypted_data, AES.block_size)
-        return unpadded_text.decode('utf-8')
+        return self.decrypt_ecb_bytes(binascii.unhexlify(ciphertext)).decode('utf-8')
 
     def encrypt_cbc(self, plaintext, iv):
         """Encrypt using AES in CBC mode"""
-        cipher = AES.new(self.key, AES.MODE_CBC, iv)
-        padded_text = pad(plaintext.encode(), AES.block_size)
-        encrypted_text = cipher.encrypt(padded_text)
-        return binascii.hexlify(encrypted_text).decode('utf-8')
+        return binascii.hexlify(self.encrypt_cbc_bytes(plaintext.encode(), iv)).decode('utf-8')
 
     def decrypt_cbc(self, ciphertext, iv):
         """Decrypt using AES in CBC mode"""
-        cipher = AES.new(self.key, AES.MODE_CBC, iv)
-        encrypted_data = binascii.unhexlify(ciphertext)
-        decrypted_data = cipher.decrypt(encrypted_data)
-        unpadded_text = unpad(decrypted_data, AES.block_size)
-        return unpadded_text.decode('utf-8')
+        return self.decrypt_cbc_bytes(binascii.unhexlify(ciphertext), iv).decode('utf-8')
 
     def encrypt_ctr(self, plaintext, nonce):
         """Encrypt using AES in CTR mode"""
-        cipher = AES.new(self.key, AES.MODE_CTR, nonce=nonce)
-        encrypted_text = cipher.encrypt(plaintext.encode())
-        return binascii.hexlify(encrypted_text).decode('utf-8')
+        return binascii.hexlify(self.encrypt_ctr_bytes(plaintext.encode(), nonce)).decode('utf-8')
 
     def decrypt_ctr(self, ciphertext, nonce):
         """Decrypt using AES in CTR mode"""
-        cipher = AES.new(self.key, AES.MODE_CTR, nonce=nonce)
-        encrypted_data = binascii.unhexlify(ciphertext)
-        decrypted_data = cipher.decrypt(encrypted_data)
-        return decrypted_data.decode('utf-8')
+        return self.decrypt_ctr_bytes(binascii.unhexlify(ciphertext), nonce).decode('utf-8')
+
+    # Streaming API: raw bytes, constant memory
+    def _stream_cipher(self, mode, iv, buffer_size):
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Unsupported stream mode: {mode}")
+        if buffer_size <= 0 or buffer_size % AES.block_size:
+            raise ValueError(f"Buffer size must be a positive multiple of {AES.block_size}")
+        if mode == 'cbc':
+            return AES.new(self.key, AES.MODE_CBC, iv=iv)
+        return AES.new(self.key, AES.MODE_CTR, nonce=iv)
+
+    def encrypt_stream(self, src, dst, iv, mode='cbc', buffer_size=BUFFER_SIZE):
+        """
+        Encrypt binary file-like src into dst (raw bytes, no IV header).
+        iv is the 16-byte IV for 'cbc' (PKCS#7 padded) or the nonce for 'ctr'.
+        Data is read with readinto() into one preallocated buffer and
+        encrypted in place, so memory use does not depend on the stream size.
+        Returns the number of bytes written.
+        """
+        cipher = self._stream_cipher(mode, iv, buffer_size)
+        block = AES.block_size
+        # Room for one block of padding after a full buffer
+        buf = memoryview(bytearray(buffer_size + block))
+        body = buf[:buffer_size]
+        written = 0
+        while True:
+            n = readinto_full(src, body)
+            if n == buffer_size:
+                cipher.encrypt(body, output=body)
+                dst.write(body)
+                written += n
+                continue
+            if mode == 'cbc':
+                pad_len = block - n % block
+                buf[n:n + pad_len] = bytes([pad_len]) * pad_len
+                n += pad_len
+            if n:
+                cipher.encrypt(buf[:n], output=buf[:n])
+                dst.write(buf[:n])
+                written += n
+            return written
+
+    def decrypt_stream(self, src, dst, iv, mode='cbc', buffer_size=BUFFER_SIZE):
+        """
+        Decrypt binary file-like src (output of encrypt_stream) into dst.
+        For 'cbc' the last decrypted block is held back until the end of the
+        stream so the padding can be checked and removed.
+        Returns the number of bytes written.
+        """
+        cipher = self._stream_cipher(mode, iv, buffer_size)
+        block = AES.block_size
+        body = memoryview(bytearray(buffer_size))
+        last = bytearray(block)
+        have_last = False
+        written = 0
+        while True:
+            n = readinto_full(src, body)
+            if not n:
+                break
+            chunk = body[:n]
+            if mode == 'ctr':
+                cipher.decrypt(chunk, output=chunk)
+                dst.write(chunk)
+                written += n
+                continue
+            if n % block:
+                raise ValueError("Ciphertext length is not a multiple of the block size")
+            cipher.decrypt(chunk, output=chunk)
+            if have_last:
+                dst.write(last)
+                written += block
+            dst.write(chunk[:n - block])
+            written += n - block
+            last[:] = chunk[n - block:]
+            have_last = True
+        if mode == 'cbc':
+            if not have_last:
+                raise ValueError("Ciphertext is empty")
+            tail = unpad(bytes(last), block)
+            dst.write(tail)
+            written += len(tail)
+        return written
+
+    def encrypt_file(self, src_path, dst_path, mode='cbc', buffer_size=BUFFER_SIZE, workers=1):
+        """
+        Encrypt a file of any size with a random IV/nonce, which is written
+        at the start of dst_path. Returns the IV/nonce.
+        With workers other than 1 (None for all cores), CTR runs on a process
+        pool (parallel_aes); CBC encryption is sequential either way.
+        """
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Unsupported stream mode: {mode}")
+        if mode == 'ctr' and workers != 1:
+            return parallel_ctr_encrypt_file(self.key, src_path, dst_path, workers)
+        iv = get_random_bytes(STREAM_MODES[mode])
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            dst.write(iv)
+            self.encrypt_stream(src, dst, iv, mode, buffer_size)
+        return iv
+
+    def decrypt_file(self, src_path, dst_path, mode='cbc', buffer_size=BUFFER_SIZE, workers=1):
+        """
+        Decrypt a file written by encrypt_file. Returns the plaintext size.
+        With workers other than 1 (None for all cores), both modes run on a
+        process pool (parallel_aes).
+        """
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Unsupported stream mode: {mode}")
+        if workers != 1:
+            decrypt = parallel_ctr_decrypt_file if mode == 'ctr' else parallel_cbc_decrypt_file
+            return decrypt(self.key, src_path, dst_path, workers)
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            iv = src.read(STREAM_MODES[mode])
+            if len(iv) != STREAM_MODES[mode]:
+                raise ValueError("File is too short to hold the IV")
+            return self.decrypt_stream(src, dst, iv, mode, buffer_size)
+
+    # Seekable container: AES-GCM chunks with random-access reads
+    def encrypt_container(self, src_path, dst_path, chunk_size=CHUNK_SIZE):
+        """Encrypt a file into a chunked AES-GCM container (see aes_container); returns the chunk count"""
+        return create_container(self.key, src_path, dst_path, chunk_size)
+
+    def open_container(self, path):
+        """ContainerReader for random-access, authenticated reads of a container"""
+        return ContainerReader(self.key, path)
 
 # Example usage
 if __name__ == "__main__":
@@ -116,7 +269,7 @@ if __name__ == "__main__":
 
     # Example 4: AES CTR Mode
     print("\nAES CTR Mode Example:")
-    nonce = binascii.unhexlify("00000000000000000000000000000000")
+    nonce = binascii.unhexlify("0000000000000000")
     message = "Cryptography Lab Exercise"
     
     encrypted_ctr = aes128.encrypt_ctr(message, nonce)
@@ -140,4 +293,25 @@ if __name__ == "__main__":
         decrypted = aes.decrypt_ecb(encrypted)
         end_time = time.time()
         
-        print(f"AES-{bits} time: {end_time - start_time:.4f} seconds")
\ No newline at end of file
+        print(f"AES-{bits} time: {end_time - start_time:.4f} seconds")
+
+    # Example 5: streaming file encryption (raw bytes, constant memory)
+    print("\nAES File Encryption Example:")
+    import os
+    import tempfile
+    aes = AESCipher(256)
+    aes.generate_key()
+    with tempfile.TemporaryDirectory() as tmp:
+        src, enc, dec = (os.path.join(tmp, name) for name in ('data.bin', 'data.enc', 'data.out'))
+        with open(src, 'wb') as f:
+            f.write(os.urandom(64 << 20))
+        for mode in ('cbc', 'ctr'):
+            start_time = time.perf_counter()
+            aes.encrypt_file(src, enc, mode)
+            middle_time = time.perf_counter()
+            aes.decrypt_file(enc, dec, mode)
+            end_time = time.perf_counter()
+            with open(src, 'rb') as a, open(dec, 'rb') as b:
+                same = a.read() == b.read()
+            print(f"AES-256-{mode.upper()} 64 MB: encrypt {64 / (middle_time - start_time):.0f} MB/s, "
+                  f"decrypt {64 / (end_time - middle_time):.0f} MB/s, round trip ok: {same}")
@@ -0,0 +1,338 @@
+"""
+annealing_solver.py
+
+Stochastic key search (simulated annealing / hill climbing) for the Playfair
+cipher and general monoalphabetic substitution.
+
+Fitness is the sum of n-gram log-probabilities of the candidate plaintext:
+the compiled quadgram model from ngram_model.py when it has been built,
+otherwise the bigram table from cryptanalysis. Model files are passed to the
+pool workers by path and memory-mapped there, not pickled.
+
+Substitution scoring is incremental: swapping two key letters only alters
+the positions of those two ciphertext letters, so only the n-grams that
+overlap them are re-scored. Playfair moves are scored in vectorized batches
+(see anneal_playfair).
+
+Independent restarts run in a process pool; the search stops as soon as a
+result passes the confidence threshold (mean log-probability per n-gram).
+The runs still in progress are told to stop through an event shared with
+the pool workers, which they poll every STOP_CHECK_STEPS steps, and return
+their best key so far.
+
+Example:
+    key, plaintext, score = solve_substitution(ciphertext, restarts=8)
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Event
+
+import numpy as np
+
+from cryptanalysis import clean_text, letter_values, bigram_log_table
+from ngram_model import DEFAULT_MODEL_PATH, load_ngram_model
+from playfair_cipher import PlayfairCipher
+
+# Letter values of the 25-letter Playfair alphabet (I and J share a cell)
+PLAYFAIR_LETTERS = np.array([v for v in range(26) if v != 9])
+
+# (cell, cell) -> (cell, cell) for Playfair decryption; independent of the key
+PLAYFAIR_DECRYPT_CELLS = PlayfairCipher.digraph_table(np.arange(25), -1).astype(np.int64)
+
+# Default Playfair starting temperature per ciphertext letter
+PLAYFAIR_TEMP_PER_LETTER = 0.08
+
+# Annealing steps between checks of the stop event
+STOP_CHECK_STEPS = 1000
+
+# Stop event of the current pool worker (set by _init_worker)
+_stop_event = None
+
+
+class NgramScorer:
+    """
+    Incremental n-gram fitness over a plaintext array of letter values.
+    table is a flat 26^n array of log-probabilities or a model file path.
+    """
+
+    def __init__(self, table):
+        if isinstance(table, str):
+            table = load_ngram_model(table)
+        self.table = np.asarray(table).reshape(-1)
+        self.n = int(round(math.log(len(self.table), 26)))
+
+    def _indices(self, values, starts):
+        idx = np.zeros(len(starts), dtype=np.int64)
+        for k in range(self.n):
+            idx = idx * 26 + values[starts + k]
+        return idx
+
+    def total(self, values):
+        starts = np.arange(max(len(values) - self.n + 1, 0))
+        return float(self.table[self._indices(values, starts)].sum())
+
+    def affected(self, positions, length):
+        """Start indices of every n-gram that contains one of positions"""
+        # mark[s + n - 1] is set for every start s in [p - n + 1, p]
+        mark = np.zeros(length + self.n, dtype=bool)
+        for k in range(self.n):
+            mark[positions + k] = True
+        return np.flatnonzero(mark[self.n - 1:length])
+
+    def partial(self, values, starts):
+        return float(self.table[self._indices(values, starts)].sum())
+
+    def total_rows(self, values):
+        """Fitness of every row of a 2-D array of plaintexts"""
+        width = values.shape[1] - self.n + 1
+        idx = np.zeros((len(values), max(width, 0)), dtype=np.int64)
+        for k in range(self.n):
+            idx = idx * 26 + values[:, k:k + width]
+        return self.table[idx].sum(axis=1, dtype=np.float64)
+
+
+def _group_positions(keys, count):
+    """positions[k] = indices i with keys[i] == k"""
+    order = np.argsort(keys, kind='stable')
+    bounds = np.searchsorted(keys[order], np.arange(count + 1))
+    return [order[bounds[k]:bounds[k + 1]] for k in range(count)]
+
+
+def _temperature(step, iterations, start_temp):
+    """Linear cooling from start_temp towards zero"""
+    return start_temp * np.maximum(1 - step / iterations, 0) + 1e-3
+
+
+def _stopped(stop, step, next_check):
+    """(stop requested, next check step); polls stop once step reaches next_check"""
+    if stop is None or step < next_check:
+        return False, next_check
+    return stop.is_set(), step + STOP_CHECK_STEPS
+
+
+def anneal_substitution(values, table, seed, iterations=20000, start_temp=2.0, stop=None):
+    """
+    One annealing run for a monoalphabetic substitution. The state is the
+    decryption map (cipher letter -> plain letter); a move swaps two entries,
+    which only changes the positions of those two cipher letters. The run
+    ends early once the stop event (if given) is set.
+    Returns (decrypt_map, score).
+    """
+    rng = np.random.default_rng(seed)
+    scorer = NgramScorer(table)
+    positions = _group_positions(values, 26)
+    present = np.array([k for k in range(26) if len(positions[k])])
+    decrypt_map = rng.permutation(26)
+    plain = decrypt_map[values]
+    score = scorer.total(plain)
+    best_map, best_score = decrypt_map.copy(), score
+    next_check = STOP_CHECK_STEPS
+    for step in range(iterations):
+        stopped, next_check = _stopped(stop, step, next_check)
+        if stopped:
+            break
+        x = present[rng.integers(len(present))]
+        y = rng.integers(26)
+        if x == y:
+            continue
+        changed = np.concatenate([positions[x], positions[y]])
+        starts = scorer.affected(changed, len(plain))
+        old = scorer.partial(plain, starts)
+        decrypt_map[x], decrypt_map[y] = decrypt_map[y], decrypt_map[x]
+        plain[positions[x]] = decrypt_map[x]
+        plain[positions[y]] = decrypt_map[y]
+        delta = scorer.partial(plain, starts) - old
+        temp = _temperature(step, iterations, start_temp)
+        if delta >= 0 or rng.random() < math.exp(delta / temp):
+            score += delta
+            if score > best_score:
+                best_map, best_score = decrypt_map.copy(), score
+        else:
+            # Undo the swap
+            decrypt_map[x], decrypt_map[y] = decrypt_map[y], decrypt_map[x]
+            plain[positions[x]] = decrypt_map[x]
+            plain[positions[y]] = decrypt_map[y]
+    return best_map, best_score
+
+
+def _playfair_moves(square, rng, count):
+    """
+    count candidate squares derived from square: mostly single cell swaps,
+    sometimes a swap of two rows or two columns
+    """
+    perm = np.tile(np.arange(25), (count, 1))
+    rows = np.arange(count)
+    i, j = rng.integers(25, size=(2, count))
+    perm[rows, i], perm[rows, j] = j, i
+    kind = rng.random(count)
+    grid = perm.reshape(count, 5, 5)
+    a, b = rng.integers(5, size=(2, count))
+    for selected, axis in ((kind > 0.9, 1), (kind > 0.95, 2)):
+        k = np.flatnonzero(selected)
+        grid[k] = np.arange(25).reshape(5, 5)
+        if axis == 1:
+            grid[k, a[k]], grid[k, b[k]] = grid[k, b[k]], grid[k, a[k]]
+        else:
+            grid[k, :, a[k]], grid[k, :, b[k]] = grid[k, :, b[k]], grid[k, :, a[k]]
+    return square[perm]
+
+
+def _playfair_scores(squares, digraphs, scorer):
+    """Score the decryption of the ciphertext digraphs under each square"""
+    count = len(squares)
+    cell_of = np.empty((count, 26), dtype=np.int64)
+    np.put_along_axis(cell_of, squares, np.arange(25)[None, :].repeat(count, 0), 1)
+    cells = cell_of[:, PLAYFAIR_LETTERS]
+    pairs = cells[:, digraphs // 25] * 25 + cells[:, digraphs % 25]
+    out = PLAYFAIR_DECRYPT_CELLS.reshape(625, 2)[pairs].reshape(count, -1)
+    plain = np.take_along_axis(squares, out, 1)
+    return scorer.total_rows(plain)
+
+
+def anneal_playfair(values, table, seed, iterations=500000, start_temp=None, max_batch=64,
+                    stop=None):
+    """
+    One annealing run for Playfair. values are the ciphertext letter values
+    (even length). Returns (square as letter values, score). The default
+    start_temp grows with the text, since so does the score change of a move.
+    The run ends early once the stop event (if given) is set.
+
+    A single cell swap changes the decryption of every digraph that touches
+    either cell's row or column, so instead of rescoring a move at a time,
+    a batch of candidate moves from the current square is scored together and
+    the first one that passes the Metropolis test is taken. Rejected moves
+    leave the state unchanged, so this is the same walk as one-at-a-time
+    annealing. The batch grows as the acceptance rate falls while cooling.
+    """
+    rng = np.random.default_rng(seed)
+    scorer = NgramScorer(table)
+    if start_temp is None:
+        start_temp = PLAYFAIR_TEMP_PER_LETTER * len(values)
+    # Ciphertext digraphs as (first * 25 + second) over the 25-letter alphabet
+    index25 = np.searchsorted(PLAYFAIR_LETTERS, np.where(values == 9, 8, values))
+    digraphs = index25[0::2] * 25 + index25[1::2]
+    square = PLAYFAIR_LETTERS[rng.permutation(25)]
+    score = _playfair_scores(square[None, :], digraphs, scorer)[0]
+    best_square, best_score = square, score
+    step, batch, gap = 0, 1, 1.0
+    next_check = STOP_CHECK_STEPS
+    while step < iterations:
+        stopped, next_check = _stopped(stop, step, next_check)
+        if stopped:
+            break
+        candidates = _playfair_moves(square, rng, batch)
+        delta = _playfair_scores(candidates, digraphs, scorer) - score
+        temp = _temperature(step + np.arange(batch), iterations, start_temp)
+        accept = (delta >= 0) | (rng.random(batch) < np.exp(np.minimum(delta, 0) / temp))
+        # Running average of proposals per accepted move sets the next batch size
+        first = int(np.argmax(accept)) if accept.any() else 2 * batch
+        gap = 0.9 * gap + 0.1 * (first + 1)
+        batch = int(min(max(gap, 1), max_batch))
+        if not accept.any():
+            step += len(candidates)
+            continue
+        step += first + 1
+        square, score = candidates[first], score + delta[first]
+        if score > best_score:
+            best_square, best_score = square, score
+    return best_square, float(best_score)
+
+
+def default_table():
+    """The quadgram model file if it has been built, else the bigram table"""
+    if os.path.exists(DEFAULT_MODEL_PATH):
+        return DEFAULT_MODEL_PATH
+    return bigram_log_table()
+
+
+def _init_worker(stop):
+    global _stop_event
+    _stop_event = stop
+
+
+def _restart(worker, values, table, seed, iterations):
+    """Pool entry point: one annealing run that honours the worker's stop event"""
+    return worker(values, table, seed, iterations, stop=_stop_event)
+
+
+def _run_restarts(worker, values, table, restarts, workers, threshold, iterations, seed):
+    """
+    Run restarts in a process pool. Once a result reaches threshold, the
+    runs in progress are told to stop, the queued ones are cancelled and the
+    best result so far is returned without waiting for the pool.
+    """
+    ngrams = max(len(values) - NgramScorer(table).n + 1, 1)
+    best = None
+    # Handed to the workers when they start (an Event cannot be pickled into a task)
+    stop = Event()
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                               initializer=_init_worker, initargs=(stop,))
+    try:
+        futures = [pool.submit(_restart, worker, values, table, seed + r, iterations)
+                   for r in range(restarts)]
+        for future in as_completed(futures):
+            key, score = future.result()
+            if best is None or score > best[1]:
+                best = (key, score)
+            if threshold is not None and best[1] / ngrams >= threshold:
+                stop.set()
+                break
+    finally:
+        pool.shutdown(wait=not stop.is_set(), cancel_futures=True)
+    return best[0], best[1] / ngrams
+
+
+def solve_substitution(ciphertext, restarts=8, workers=None, iterations=20000,
+                       threshold=None, table=None, seed=0):
+    """
+    Break a monoalphabetic substitution cipher.
+    Returns (key, plaintext, score) where key[i] is the ciphertext letter for
+    plaintext letter i and score is the mean log-probability per n-gram.
+    """
+    text = clean_text(ciphertext)
+    values = letter_values(text)
+    table = default_table() if table is None else table
+    decrypt_map, score = _run_restarts(anneal_substitution, values, table, restarts,
+                                       workers, threshold, iterations, seed)
+    key = ''.join(chr(65 + int(c)) for c in np.argsort(decrypt_map))
+    plaintext = text.translate(str.maketrans(
+        ''.join(chr(65 + c) for c in range(26)),
+        ''.join(chr(65 + int(p)) for p in decrypt_map)))
+    return key, plaintext, score
+
+
+def solve_playfair(ciphertext, restarts=8, workers=None, iterations=500000,
+                   threshold=None, table=None, seed=0):
+    """
+    Break a Playfair cipher.
+    Returns (key_square, plaintext, score); key_square is a 25-letter string
+    that can be passed as the key to playfair_cipher.playfair_decrypt.
+    """
+    values = letter_values(clean_text(ciphertext))
+    if len(values) % 2:
+        raise ValueError("Playfair ciphertext must be an even number of letters")
+    table = default_table() if table is None else table
+    square, score = _run_restarts(anneal_playfair, values, table, restarts,
+                                  workers, threshold, iterations, seed)
+    key = ''.join(chr(65 + int(v)) for v in square)
+    return key, PlayfairCipher(key).decrypt(ciphertext), score
+
+
+if __name__ == '__main__':
+    import random
+    message = ("It was the best of times it was the worst of times it was the age of wisdom "
+               "it was the age of foolishness it was the epoch of belief it was the epoch of "
+               "incredulity it was the season of light it was the season of darkness it was "
+               "the spring of hope it was the winter of despair we had everything before us "
+               "we had nothing before us we were all going direct to heaven we were all going "
+               "direct the other way")
+    alphabet = [chr(65 + i) for i in range(26)]
+    secret = alphabet[:]
+    random.Random(1).shuffle(secret)
+    ciphertext = clean_text(message).translate(str.maketrans(''.join(alphabet), ''.join(secret)))
+    print("Substitution ciphertext:", ciphertext[:50] + "...")
+    key, plaintext, score = solve_substitution(ciphertext, restarts=4)
+    print(f"Recovered key {key} (score {score:.2f})")
+    print(f"Plaintext: {plaintext}")
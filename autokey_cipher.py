@@ -1,4 +1,4 @@
-import string
+from classical_engine import autokey_transform
 
 def clean_text(text):
     """Remove spaces and convert to uppercase"""
@@ -11,45 +11,15 @@ def autokey_encrypt(plaintext, key):
     plaintext = "HELLO"
     key = 7
     """
-    alphabet = string.ascii_uppercase
     plaintext = clean_text(plaintext)
-    ciphertext = ''
-    
-    for i, char in enumerate(plaintext):
-        if char in alphabet:
-            # For first character, use the initial key
-            if i == 0:
-                shift = key
-            # For subsequent characters, use previous plaintext character position
-            else:
-                shift = alphabet.index(plaintext[i-1])
-            # Apply shift
-            idx = (alphabet.index(char) + shift) % 26
-            ciphertext += alphabet[idx]
-        else:
-            ciphertext += char
-    return ciphertext
+    # First letter is shifted by key, every later letter by the previous plaintext letter
+    return autokey_transform(plaintext, key)
 
 def autokey_decrypt(ciphertext, key):
     """Decrypt using initial key and recovered plaintext"""
-    alphabet = string.ascii_uppercase
     ciphertext = clean_text(ciphertext)
-    plaintext = ''
-    
-    for i, char in enumerate(ciphertext):
-        if char in alphabet:
-            # For first character, use the initial key
-            if i == 0:
-                shift = key
-            # For subsequent characters, use previous recovered plaintext character
-            else:
-                shift = alphabet.index(plaintext[i-1])
-            # Apply reverse shift
-            idx = (alphabet.index(char) - shift) % 26
-            plaintext += alphabet[idx]
-        else:
-            plaintext += char
-    return plaintext
+    # p_i = c_i - p_(i-1) is unrolled into an alternating cumulative sum
+    return autokey_transform(ciphertext, key, decrypt=True)
 
 # Example usage
 if __name__ == "__main__":
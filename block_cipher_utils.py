@@ -0,0 +1,256 @@
+"""
+block_cipher_utils.py
+
+Binary helpers shared by AESCipher, DESCipher and TripleDESCipher.
+
+The functions take a pycryptodome cipher object and any buffer-protocol
+object (bytes, bytearray, memoryview, mmap). With output=None the result is
+returned as bytes; otherwise it is written into the caller's writable buffer
+and the number of bytes written is returned, so a loop over many records
+can reuse one output buffer.
+
+PKCS#7 padding is applied without copying large inputs: the whole blocks
+are encrypted straight from the input, and only the last partial block plus
+the padding is built separately. ECB and CBC cipher objects keep their
+chaining state between calls, so this gives the same ciphertext as pad() +
+encrypt(). Inputs up to SMALL_INPUT bytes are copied and encrypted in one
+call instead, since every cipher call has a fixed cost of a few microseconds.
+
+CipherContext keeps the cipher objects of one key so that the key schedule
+is computed once instead of on every call (see CipherContext), and
+ContextPool hands contexts out to threads so they never share one.
+"""
+
+from Crypto.Util.Padding import unpad
+
+# Inputs up to this size are padded in a copy and encrypted in a single call
+SMALL_INPUT = 4096
+
+# Longest CTR input whose keystream is made from the cached ECB object; above
+# this the one-off cost of a new CTR object is small next to the encryption
+CTR_KEYSTREAM_LIMIT = 4096
+
+
+def as_bytes_view(data):
+    """Flat unsigned-byte memoryview of any buffer-protocol object"""
+    view = memoryview(data)
+    return view if view.format == 'B' and view.ndim == 1 else view.cast('B')
+
+
+def readinto_full(src, view):
+    """readinto() until view is full or the stream ends; returns the byte count"""
+    filled = 0
+    while filled < len(view):
+        n = src.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+def padded_size(length, block_size):
+    """Ciphertext size of length bytes after PKCS#7 padding"""
+    return (length // block_size + 1) * block_size
+
+
+def _check_output(output, size):
+    out = as_bytes_view(output)
+    if out.readonly:
+        raise TypeError("output must be a writable buffer")
+    if len(out) < size:
+        raise ValueError(f"output buffer too small: need {size} bytes, got {len(out)}")
+    return out
+
+
+def _padding(length, block_size):
+    pad_len = block_size - length % block_size
+    return bytes([pad_len]) * pad_len
+
+
+def encrypt_padded(cipher, data, output=None):
+    """PKCS#7 pad and encrypt data with an ECB/CBC cipher object"""
+    view = as_bytes_view(data)
+    block_size = cipher.block_size
+    size = padded_size(len(view), block_size)
+    out = None if output is None else _check_output(output, size)
+    if len(view) <= SMALL_INPUT:
+        padded = view.tobytes() + _padding(len(view), block_size)
+        if out is None:
+            return cipher.encrypt(padded)
+        cipher.encrypt(padded, output=out[:size])
+        return size
+    full = size - block_size
+    last = view[full:].tobytes() + _padding(len(view), block_size)
+    if out is None:
+        return cipher.encrypt(view[:full]) + cipher.encrypt(last)
+    cipher.encrypt(view[:full], output=out[:full])
+    cipher.encrypt(last, output=out[full:size])
+    return size
+
+
+def decrypt_padded(cipher, data, output=None):
+    """
+    Decrypt data with an ECB/CBC cipher object and strip the PKCS#7 padding.
+    With output, output needs room for the whole ciphertext and the
+    plaintext length is returned. Raises ValueError on bad length or padding.
+    """
+    view = as_bytes_view(data)
+    block_size = cipher.block_size
+    if not view or len(view) % block_size:
+        raise ValueError("Ciphertext length is not a multiple of the block size")
+    if output is None:
+        return unpad(cipher.decrypt(view), block_size)
+    out = _check_output(output, len(view))
+    cipher.decrypt(view, output=out[:len(view)])
+    last = unpad(bytes(out[len(view) - block_size:len(view)]), block_size)
+    return len(view) - block_size + len(last)
+
+
+def transform(func, data, output=None):
+    """Apply an unpadded cipher function (e.g. CTR encrypt/decrypt) to data"""
+    view = as_bytes_view(data)
+    if output is None:
+        return func(view)
+    out = _check_output(output, len(view))
+    func(view, output=out[:len(view)])
+    return len(view)
+
+
+def _xor(a, b):
+    """XOR of two equal-length byte strings"""
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
+
+class CipherContext:
+    """
+    Cipher objects for one key, created once and reused across calls.
+    Not thread-safe: take contexts from a ContextPool.
+
+    - ECB objects are stateless, so one is kept and reused.
+    - A CBC object cannot be given a new IV, but its chaining value is just
+      the last ciphertext block it produced. A new IV is bound by XORing
+      (iv ^ chaining value) into the first plaintext block (encryption) or
+      the first decrypted block (decryption).
+    - Short CTR inputs use a keystream made by encrypting the counter blocks
+      (nonce || counter from 0, as pycryptodome lays them out) with the ECB
+      object.
+    """
+
+    def __init__(self, module, key):
+        self.module = module
+        self.key = key
+        self.block_size = module.block_size
+        zero = bytes(self.block_size)
+        self.ecb = module.new(key, module.MODE_ECB)
+        self._cbc_encrypt = module.new(key, module.MODE_CBC, zero)
+        self._cbc_decrypt = module.new(key, module.MODE_CBC, zero)
+        # Chaining value (last ciphertext block) of each CBC object
+        self._encrypt_chain = zero
+        self._decrypt_chain = zero
+
+    def _check_iv(self, iv):
+        if len(iv) != self.block_size:
+            raise ValueError(f"Incorrect IV length (it must be {self.block_size} bytes long)")
+
+    def encrypt_ecb(self, data, output=None):
+        return encrypt_padded(self.ecb, data, output)
+
+    def decrypt_ecb(self, data, output=None):
+        return decrypt_padded(self.ecb, data, output)
+
+    def encrypt_cbc(self, data, iv, output=None):
+        """PKCS#7 pad and CBC-encrypt data under iv (see encrypt_padded)"""
+        self._check_iv(iv)
+        view = as_bytes_view(data)
+        bs = self.block_size
+        size = padded_size(len(view), bs)
+        mask = _xor(iv, self._encrypt_chain)
+        cipher = self._cbc_encrypt
+        if len(view) <= SMALL_INPUT:
+            padded = bytearray(view)
+            padded += _padding(len(view), bs)
+            padded[:bs] = _xor(padded[:bs], mask)
+            if output is None:
+                result = cipher.encrypt(padded)
+                self._encrypt_chain = result[-bs:]
+                return result
+            out = _check_output(output, size)
+            cipher.encrypt(padded, output=out[:size])
+        else:
+            out = memoryview(bytearray(size)) if output is None else _check_output(output, size)
+            full = size - bs
+            cipher.encrypt(_xor(view[:bs], mask), output=out[:bs])
+            cipher.encrypt(view[bs:full], output=out[bs:full])
+            cipher.encrypt(view[full:].tobytes() + _padding(len(view), bs), output=out[full:size])
+        self._encrypt_chain = out[size - bs:size].tobytes()
+        return out.tobytes() if output is None else size
+
+    def decrypt_cbc(self, data, iv, output=None):
+        """CBC-decrypt data under iv and strip the padding (see decrypt_padded)"""
+        self._check_iv(iv)
+        view = as_bytes_view(data)
+        bs = self.block_size
+        n = len(view)
+        if not n or n % bs:
+            raise ValueError("Ciphertext length is not a multiple of the block size")
+        out = bytearray(n) if output is None else _check_output(output, n)[:n]
+        # Read before decrypting, in case output is the input buffer
+        chain, self._decrypt_chain = self._decrypt_chain, bytes(view[n - bs:n])
+        self._cbc_decrypt.decrypt(view, output=out)
+        out[:bs] = _xor(out[:bs], _xor(chain, iv))
+        length = n - bs + len(unpad(bytes(out[n - bs:]), bs))
+        if output is None:
+            del out[length:]
+            return bytes(out)
+        return length
+
+    def ctr(self, data, nonce, output=None):
+        """CTR-encrypt or decrypt data (the same operation) under nonce"""
+        bs = self.block_size
+        if len(nonce) >= bs:
+            raise ValueError("Nonce is too long")
+        view = as_bytes_view(data)
+        n = len(view)
+        if n > CTR_KEYSTREAM_LIMIT:
+            cipher = self.module.new(self.key, self.module.MODE_CTR, nonce=nonce)
+            return transform(cipher.encrypt, view, output)
+        width = bs - len(nonce)
+        counters = b''.join(nonce + i.to_bytes(width, 'big') for i in range(-(-n // bs)))
+        result = _xor(view, self.ecb.encrypt(counters)[:n]) if n else b''
+        if output is None:
+            return result
+        _check_output(output, n)[:n] = result
+        return n
+
+
+class ContextPool:
+    """
+    Thread-safe pool of CipherContext objects for one key. Each call checks
+    a context out, so concurrent callers never share cipher state and never
+    wait on each other; the pool grows to the number of threads that use it
+    at the same time. list.pop() and list.append() are atomic, so no lock is
+    taken on the per-call path.
+    """
+
+    def __init__(self, module, key):
+        self.module = module
+        self.key = key
+        self._free = []
+
+    def run(self, method, *args):
+        """Call method(context, *args) with a context checked out of the pool"""
+        try:
+            ctx = self._free.pop()
+        except IndexError:
+            ctx = CipherContext(self.module, self.key)
+        try:
+            return method(ctx, *args)
+        finally:
+            self._free.append(ctx)
+
+
+def pool_for(pool, module, key):
+    """pool if it was made for key, else a new ContextPool (the key was changed)"""
+    if pool is not None and pool.key == key:
+        return pool
+    return ContextPool(module, key)
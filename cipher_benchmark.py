@@ -0,0 +1,275 @@
+"""
+cipher_benchmark.py
+
+Benchmark suite and regression check for the classical ciphers.
+
+Every cipher is timed for encryption and decryption through both the
+functional API (additive_cipher.additive_encrypt, ...) and SymmetricCiphers,
+over a range of input sizes. Each measurement does warmup calls first and
+then repeated time.perf_counter() runs; the median and 95th percentile are
+reported, with throughput (input plaintext bytes per second, for both
+directions) computed from the median. Results are written as JSON.
+
+compare() matches two result files case by case and flags every case whose
+throughput fell by more than the threshold, so a saved baseline can guard
+the fast paths.
+
+Run the suite and save a baseline:
+    python cipher_benchmark.py run -o baseline.json
+Later, run again and compare (exit status 1 on a regression):
+    python cipher_benchmark.py run -o current.json --baseline baseline.json --threshold 0.1
+or compare two saved files:
+    python cipher_benchmark.py compare baseline.json current.json
+"""
+
+import json
+import platform
+import time
+
+import numpy as np
+
+from additive_cipher import additive_encrypt, additive_decrypt
+from multiplicative_cipher import multiplicative_encrypt, multiplicative_decrypt
+from affine_cipher import affine_encrypt, affine_decrypt
+from vigenere_cipher import vigenere_encrypt, vigenere_decrypt
+from autokey_cipher import autokey_encrypt, autokey_decrypt
+from playfair_cipher import playfair_encrypt, playfair_decrypt
+from hill_cipher import hill_encrypt, hill_decrypt
+from transposition_cipher import transposition_encrypt, transposition_decrypt
+from symmetric_ciphers import SymmetricCiphers
+
+# Input sizes in bytes, 100 B to 100 MB
+SIZES = (100, 10_000, 1_000_000, 100_000_000)
+
+# Untimed calls before measuring, and timed runs per case
+WARMUP = 1
+REPEAT = 5
+
+# Inputs at least this large get at most LARGE_REPEAT timed runs
+LARGE_SIZE = 10_000_000
+LARGE_REPEAT = 3
+
+# Default allowed drop in throughput before compare() flags a case
+THRESHOLD = 0.10
+
+HILL_KEY = np.array([[3, 3], [2, 5]])
+
+_sc = SymmetricCiphers()
+
+# cipher -> api -> (encrypt, decrypt); decrypt is None where an API has none
+CASES = {
+    'additive': {
+        'functional': (lambda t: additive_encrypt(t, 7), lambda t: additive_decrypt(t, 7)),
+        'symmetric': (lambda t: _sc.additive_cipher_encrypt(t, 7),
+                      lambda t: _sc.additive_cipher_decrypt(t, 7)),
+    },
+    'multiplicative': {
+        'functional': (lambda t: multiplicative_encrypt(t, 15),
+                       lambda t: multiplicative_decrypt(t, 15)),
+        'symmetric': (lambda t: _sc.multiplicative_cipher_encrypt(t, 15),
+                      lambda t: _sc.multiplicative_cipher_decrypt(t, 15)),
+    },
+    'affine': {
+        'functional': (lambda t: affine_encrypt(t, 15, 20), lambda t: affine_decrypt(t, 15, 20)),
+        'symmetric': (lambda t: _sc.affine_cipher_encrypt(t, 15, 20),
+                      lambda t: _sc.affine_cipher_decrypt(t, 15, 20)),
+    },
+    'vigenere': {
+        'functional': (lambda t: vigenere_encrypt(t, 'DOLLARS'),
+                       lambda t: vigenere_decrypt(t, 'DOLLARS')),
+        'symmetric': (lambda t: _sc.vigenere_cipher_encrypt(t, 'DOLLARS'),
+                      lambda t: _sc.vigenere_cipher_decrypt(t, 'DOLLARS')),
+    },
+    'autokey': {
+        'functional': (lambda t: autokey_encrypt(t, 7), lambda t: autokey_decrypt(t, 7)),
+        'symmetric': (lambda t: _sc.autokey_cipher_encrypt(t, 7),
+                      lambda t: _sc.autokey_cipher_decrypt(t, 7)),
+    },
+    'playfair': {
+        'functional': (lambda t: playfair_encrypt(t, 'MONARCHY'),
+                       lambda t: playfair_decrypt(t, 'MONARCHY')),
+        'symmetric': (lambda t: _sc.playfair_cipher_encrypt(t, 'MONARCHY'),
+                      lambda t: _sc.playfair_cipher_decrypt(t, 'MONARCHY')),
+    },
+    'hill': {
+        'functional': (lambda t: hill_encrypt(t, HILL_KEY), lambda t: hill_decrypt(t, HILL_KEY)),
+        'symmetric': (lambda t: _sc.hill_cipher_encrypt(t, HILL_KEY),
+                      lambda t: _sc.hill_cipher_decrypt(t, HILL_KEY)),
+    },
+    'transposition': {
+        'functional': (lambda t: transposition_encrypt(t, 'ZEBRAS'),
+                       lambda t: transposition_decrypt(t, 'ZEBRAS')),
+    },
+}
+
+
+def sample_text(size, seed=0):
+    """size bytes of mixed-case letters and spaces (about one word in six letters)"""
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(65, 91, size=size, dtype=np.uint8)
+    codes[rng.random(size) < 0.5] += 32
+    codes[rng.random(size) < 1 / 6] = 32
+    return codes.tobytes().decode('ascii')
+
+
+def measure(func, arg, warmup=WARMUP, repeat=REPEAT):
+    """Run func(arg) warmup times untimed, then repeat times; returns the run times"""
+    for _ in range(warmup):
+        func(arg)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(times, size):
+    """median / p95 seconds and throughput (MB/s at the median) of a list of run times"""
+    median = float(np.median(times))
+    return {
+        'median': median,
+        'p95': float(np.percentile(times, 95)),
+        'mb_per_s': size / 1e6 / median if median > 0 else float('inf'),
+        'runs': len(times),
+    }
+
+
+def run_suite(sizes=SIZES, ciphers=None, apis=None, warmup=WARMUP, repeat=REPEAT,
+              progress=None):
+    """
+    Benchmark every selected cipher, API and direction at each size.
+    Decryption is timed on the ciphertext of the same input.
+    progress(result) is called after each case. Returns the JSON-ready report.
+    """
+    results = []
+    for size in sizes:
+        text = sample_text(size)
+        runs = min(repeat, LARGE_REPEAT) if size >= LARGE_SIZE else repeat
+        for cipher, variants in CASES.items():
+            if ciphers and cipher not in ciphers:
+                continue
+            for api, (encrypt, decrypt) in variants.items():
+                if apis and api not in apis:
+                    continue
+                ciphertext = None
+                for op, func in (('encrypt', encrypt), ('decrypt', decrypt)):
+                    if func is None:
+                        continue
+                    if op == 'decrypt':
+                        ciphertext = ciphertext or encrypt(text)
+                    times = measure(func, text if op == 'encrypt' else ciphertext, warmup, runs)
+                    result = {'cipher': cipher, 'api': api, 'op': op, 'size': size}
+                    result.update(summarize(times, size))
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'warmup': warmup,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def _case_key(result):
+    return result['cipher'], result['api'], result['op'], result['size']
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """
+    Compare two reports (dicts, or paths of JSON files) case by case.
+    Returns a list of (case, baseline MB/s, current MB/s, ratio, regressed)
+    for the cases present in both; regressed is True when the current
+    throughput is below (1 - threshold) times the baseline.
+    """
+    baseline, current = (_load(r) if isinstance(r, str) else r for r in (baseline, current))
+    before = {_case_key(r): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        key = _case_key(result)
+        if key not in before:
+            continue
+        old, new = before[key]['mb_per_s'], result['mb_per_s']
+        ratio = new / old if old else float('inf')
+        rows.append((key, old, new, ratio, ratio < 1 - threshold))
+    return rows
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def _format_size(size):
+    for unit, scale in (('MB', 10 ** 6), ('KB', 10 ** 3)):
+        if size >= scale:
+            return f"{size / scale:g} {unit}"
+    return f"{size} B"
+
+
+def print_result(result):
+    print(f"{result['cipher']:15} {result['api']:11} {result['op']:8} "
+          f"{_format_size(result['size']):>8}  median {result['median'] * 1e3:10.3f} ms  "
+          f"p95 {result['p95'] * 1e3:10.3f} ms  {result['mb_per_s']:9.2f} MB/s")
+
+
+def print_comparison(rows, threshold=THRESHOLD):
+    """Print the comparison table; returns the number of regressions"""
+    regressions = 0
+    for (cipher, api, op, size), old, new, ratio, regressed in rows:
+        regressions += regressed
+        flag = 'REGRESSION' if regressed else ''
+        print(f"{cipher:15} {api:11} {op:8} {_format_size(size):>8}  "
+              f"{old:9.2f} -> {new:9.2f} MB/s  {ratio:6.2f}x  {flag}")
+    print(f"{regressions} of {len(rows)} cases slower than the baseline by more than "
+          f"{threshold:.0%}")
+    return regressions
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Benchmark the classical ciphers')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmark suite')
+    run.add_argument('-o', '--output', help='write the JSON report here')
+    run.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='input sizes in bytes')
+    run.add_argument('--ciphers', nargs='+', choices=list(CASES))
+    run.add_argument('--apis', nargs='+', choices=['functional', 'symmetric'])
+    run.add_argument('--warmup', type=int, default=WARMUP)
+    run.add_argument('--repeat', type=int, default=REPEAT)
+    run.add_argument('--baseline', help='JSON report to compare the results against')
+    run.add_argument('--threshold', type=float, default=THRESHOLD,
+                     help='allowed throughput drop, e.g. 0.1 for 10%%')
+
+    cmp = commands.add_parser('compare', help='compare two saved reports')
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=THRESHOLD)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        report = run_suite(args.sizes, args.ciphers, args.apis, args.warmup, args.repeat,
+                           progress=print_result)
+        if args.output:
+            save(report, args.output)
+        baseline = args.baseline
+    else:
+        report, baseline = _load(args.current), args.baseline
+    if baseline:
+        rows = compare(baseline, report, args.threshold)
+        sys.exit(1 if print_comparison(rows, args.threshold) else 0)
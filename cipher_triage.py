@@ -0,0 +1,278 @@
+"""
+cipher_triage.py
+
+Batch cipher-type identification for unknown ciphertexts.
+
+extract_features() computes the statistics of a whole batch in one pass: the
+letters of all ciphertexts are packed into a single array and every feature
+is a np.bincount / reduction over message ids, so the cost does not grow with
+the number of Python-level messages. classify() turns the features into a
+likely cipher family and route() hands each ciphertext to the queue of the
+matching solver.
+
+Example:
+    queues = route(ciphertexts)
+    for index, text in queues['vigenere']:
+        print(SOLVERS['vigenere'](text))
+"""
+
+import numpy as np
+
+from classical_engine import message_ids
+from modular_arithmetic import inverse_table
+from cryptanalysis import (clean_text, letter_values, ENGLISH_FREQUENCIES,
+                           LOG_ENGLISH_FREQUENCIES, ENGLISH_IOC, RANDOM_IOC,
+                           rank_additive_keys, rank_affine_keys, solve_vigenere,
+                           solve_autokey, solve_hill, solve_transposition)
+from annealing_solver import solve_substitution, solve_playfair
+
+# Cipher families, in the order the rules in classify() test them
+FAMILIES = ('autokey', 'transposition', 'additive', 'affine', 'playfair',
+            'substitution', 'hill', 'vigenere', 'unknown')
+
+# Periods tried for the periodic index of coincidence
+MAX_PERIOD = 20
+
+# IoC above which a text (or every column of it) is taken as monoalphabetic
+MONO_IOC = (ENGLISH_IOC + RANDOM_IOC) / 2
+
+# Log-likelihood per letter of English text under English letter frequencies
+ENGLISH_LOGLIK = float(ENGLISH_FREQUENCIES @ LOG_ENGLISH_FREQUENCIES)
+
+# A monoalphabetic text whose best affine decryption scores within this
+# (log-likelihood per letter) of the best possible substitution is affine
+AFFINE_MARGIN = 0.2
+
+# An autokey decryption scoring within this of ENGLISH_LOGLIK is a match
+AUTOKEY_MARGIN = 0.4
+
+# Aligned / shifted digraph IoC above which an even-length text is Hill (n=2)
+HILL_DIGRAPH_RATIO = 1.25
+
+# Periods with fewer letters per column than this are too noisy to use
+MIN_COLUMN_LETTERS = 8
+
+# Texts shorter than this are not classified
+MIN_LETTERS = 20
+
+
+def _affine_maps():
+    """(312, 26) plaintext letter for every ciphertext letter, per affine key"""
+    maps = []
+    for a in range(1, 26, 2):
+        if a == 13:
+            continue
+        inv = inverse_table(26)[a]
+        for b in range(26):
+            maps.append((inv * (np.arange(26) - b)) % 26)
+    return np.array(maps)
+
+
+# Rows 0-25 of the affine maps with a = 1 are the additive keys
+AFFINE_MAPS = _affine_maps()
+ADDITIVE_ROWS = np.arange(26)
+
+
+def _pack(ciphertexts):
+    """Letter values of all ciphertexts end to end, with message offsets"""
+    arrays = [letter_values(clean_text(text)) for text in ciphertexts]
+    lengths = np.array([len(a) for a in arrays], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    values = np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int64)
+    return values, offsets
+
+
+def _ioc(counts):
+    """Index of coincidence of each row of a letter histogram"""
+    n = counts.sum(axis=-1)
+    pairs = (counts * (counts - 1)).sum(axis=-1)
+    return np.where(n > 1, pairs / np.maximum(n * (n - 1), 1), 0.0)
+
+
+def extract_features(ciphertexts, max_period=MAX_PERIOD):
+    """
+    Statistical features of a batch of ciphertexts, one entry per text:
+    length, ioc, entropy (bits), letters_used, has_j, even_length,
+    doubled_rate (pairs 2i, 2i+1 with the same letter), periodic_ioc and
+    period (best column IoC over periods 2..max_period), english_fit
+    (unchanged letters), additive_fit / affine_fit / substitution_fit /
+    autokey_fit (best decryption) as log-likelihood per letter, and
+    digraph_ratio (IoC of aligned digraphs over that of shifted ones).
+    Returns a dict of arrays.
+    """
+    values, offsets = _pack(ciphertexts)
+    count = len(offsets) - 1
+    ids = message_ids(offsets)
+    lengths = np.diff(offsets)
+    rank = np.arange(len(values)) - offsets[:-1][ids]
+    counts = np.bincount(ids * 26 + values, minlength=count * 26).reshape(count, 26)
+    safe_len = np.maximum(lengths, 1)[:, None]
+
+    probs = counts / safe_len
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = -np.where(probs > 0, probs * np.log2(probs), 0).sum(axis=1)
+
+    # Doubled letters inside the pairs a Playfair text is made of
+    same = np.zeros(len(values), dtype=bool)
+    same[:-1] = (values[:-1] == values[1:]) & (ids[:-1] == ids[1:])
+    doubled = np.bincount(ids[same & (rank % 2 == 0)], minlength=count)
+
+    # Best average column IoC over the periods
+    periodic = np.zeros(count)
+    period = np.ones(count, dtype=np.int64)
+    for p in range(2, max_period + 1):
+        column = np.bincount((ids * p + rank % p) * 26 + values,
+                             minlength=count * p * 26).reshape(count, p, 26)
+        ioc = _ioc(column).mean(axis=1)
+        better = (ioc > periodic) & (lengths >= p * MIN_COLUMN_LETTERS)
+        periodic[better], period[better] = ioc[better], p
+
+    # counts @ LOG_ENGLISH[map] = log-likelihood of each candidate decryption
+    fits = counts @ LOG_ENGLISH_FREQUENCIES[AFFINE_MAPS].T / safe_len
+    # Row 0 (a = 1, b = 0) is the identity; taking it from fits rather than
+    # recomputing it keeps english_fit bit-identical to its entry in the
+    # maxima below, which classify() compares it with
+    english_fit = fits[:, 0]
+    # The best any substitution can do pairs the sorted counts with sorted frequencies
+    substitution_fit = np.sort(counts, axis=1) @ np.sort(LOG_ENGLISH_FREQUENCIES) / safe_len[:, 0]
+
+    # Autokey: p_i = (-1)^i (S_i - key), S the alternating sum within the text
+    sign = np.where(rank % 2, -1, 1)
+    total = np.concatenate([[0], np.cumsum(sign * values)])
+    partial = total[1:] - total[offsets[:-1]][ids]
+    autokey_fit = np.full(count, -np.inf)
+    for key in range(26):
+        plain = (sign * (partial - key)) % 26
+        key_counts = np.bincount(ids * 26 + plain, minlength=count * 26).reshape(count, 26)
+        autokey_fit = np.maximum(autokey_fit,
+                                 key_counts @ LOG_ENGLISH_FREQUENCIES / safe_len[:, 0])
+
+    # Hill maps equal plaintext digraphs at even offsets to equal ciphertext ones
+    digraph_iocs = []
+    for shift in (0, 1):
+        start = rank % 2 == shift
+        start[:-1] &= ids[:-1] == ids[1:]
+        start[-1:] = False
+        pos = np.flatnonzero(start)
+        key = ids[pos] * 676 + values[pos] * 26 + values[pos + 1]
+        pair_counts = np.bincount(key, minlength=count * 676).reshape(count, 676)
+        digraph_iocs.append(_ioc(pair_counts))
+    digraph_ratio = digraph_iocs[0] / np.maximum(digraph_iocs[1], 1e-12)
+
+    return {
+        'length': lengths,
+        'ioc': _ioc(counts),
+        'entropy': entropy,
+        'letters_used': (counts > 0).sum(axis=1),
+        'has_j': counts[:, 9] > 0,
+        'even_length': lengths % 2 == 0,
+        'doubled_rate': doubled / np.maximum(lengths // 2, 1),
+        'periodic_ioc': periodic,
+        'period': period,
+        'english_fit': english_fit,
+        'additive_fit': fits[:, ADDITIVE_ROWS].max(axis=1),
+        'affine_fit': fits.max(axis=1),
+        'substitution_fit': substitution_fit,
+        'autokey_fit': autokey_fit,
+        'digraph_ratio': digraph_ratio,
+    }
+
+
+def classify(features):
+    """
+    Most likely cipher family of every text, as an array of FAMILIES names.
+    Rules are applied in order and the first match wins:
+    - autokey: one of the 26 autokey decryptions has English letter frequencies
+    - transposition / additive / affine: English-like IoC and the best affine
+      decryption is nearly as good as any substitution; the identity map
+      means transposition, a = 1 means additive
+    - playfair: even length, no J and no doubled letter inside a pair
+    - substitution: English-like IoC but no affine map fits
+    - hill: even length and repeated aligned digraphs (2 x 2 keys)
+    - vigenere: a period whose columns have English-like IoC
+    """
+    count = len(features['length'])
+    family = np.full(count, 'unknown', dtype=object)
+    undecided = features['length'] >= MIN_LETTERS
+
+    def assign(name, mask):
+        nonlocal undecided
+        mask = mask & undecided
+        family[mask] = name
+        undecided = undecided & ~mask
+
+    mono = features['ioc'] >= MONO_IOC
+    affine_like = mono & (features['affine_fit'] >= features['substitution_fit'] - AFFINE_MARGIN)
+    assign('autokey', features['autokey_fit'] >= ENGLISH_LOGLIK - AUTOKEY_MARGIN)
+    assign('transposition', affine_like & (features['english_fit'] >= features['additive_fit']))
+    assign('additive', affine_like & (features['additive_fit'] >= features['affine_fit']))
+    assign('affine', affine_like)
+    assign('playfair', features['even_length'] & ~features['has_j'] &
+           (features['doubled_rate'] == 0))
+    assign('substitution', mono)
+    assign('hill', features['even_length'] & (features['digraph_ratio'] >= HILL_DIGRAPH_RATIO))
+    assign('vigenere', features['periodic_ioc'] >= MONO_IOC)
+    return family
+
+
+# Solver to run for each family
+SOLVERS = {
+    'transposition': solve_transposition,
+    'additive': rank_additive_keys,
+    'affine': rank_affine_keys,
+    'substitution': solve_substitution,
+    'playfair': solve_playfair,
+    'vigenere': solve_vigenere,
+    'autokey': solve_autokey,
+    'hill': solve_hill,
+}
+
+
+def route(ciphertexts, queues=None):
+    """
+    Classify a batch of ciphertexts and route each one to its family's queue.
+    queues maps every family in FAMILIES to an object with put() (e.g.
+    queue.Queue) or a list; each receives (index, ciphertext). Without queues
+    a dict of lists is returned. Raises ValueError if a family is missing.
+    """
+    if queues is None:
+        queues = {name: [] for name in FAMILIES}
+    missing = [name for name in FAMILIES if name not in queues]
+    if missing:
+        raise ValueError(f"No queue for cipher families: {', '.join(missing)}")
+    families = classify(extract_features(ciphertexts))
+    for index, (name, text) in enumerate(zip(families, ciphertexts)):
+        queue = queues[name]
+        if isinstance(queue, list):
+            queue.append((index, text))
+        else:
+            queue.put((index, text))
+    return queues
+
+
+if __name__ == '__main__':
+    from additive_cipher import additive_encrypt
+    from affine_cipher import affine_encrypt
+    from vigenere_cipher import vigenere_encrypt
+    from autokey_cipher import autokey_encrypt
+    from playfair_cipher import playfair_encrypt
+    from hill_cipher import hill_encrypt
+    from transposition_cipher import transposition_encrypt
+
+    message = ("Cryptanalysis of the Vigenere cipher starts by finding the length of the "
+               "keyword Once the length is known every column of the ciphertext is a "
+               "simple Caesar cipher and each of those can be broken by comparing its "
+               "letter frequencies with the frequencies of ordinary English text")
+    samples = {
+        'transposition': transposition_encrypt(message, "ZEBRAS"),
+        'additive': additive_encrypt(message, 11),
+        'affine': affine_encrypt(message, 7, 3),
+        'vigenere': vigenere_encrypt(message, "LEMON"),
+        'autokey': autokey_encrypt(message, 7),
+        'playfair': playfair_encrypt(message, "MONARCHY"),
+        'hill': hill_encrypt(message, np.array([[3, 3], [2, 7]])),
+    }
+    queues = route(list(samples.values()))
+    for family, items in queues.items():
+        for index, _ in items:
+            print(f"{list(samples)[index]:14} -> {family}")
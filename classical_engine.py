@@ -0,0 +1,257 @@
+"""
+classical_engine.py
+
+Shared engine for the classical (letter-based) ciphers.
+
+The monoalphabetic ciphers (additive, multiplicative, affine) are all of the
+form x -> (a*x + b) mod 26, so a single translation table per key describes the
+whole cipher. Tables are built once per (a, b, direction) and kept in a bounded
+LRU cache; encryption and decryption are then one C-level str.translate /
+bytes.translate pass instead of a Python loop with alphabet.index().
+
+The polyalphabetic ciphers (Vigenere, autokey) work on the text as a uint8
+array. Text is encoded as UTF-8, where A-Z are single bytes and never appear
+inside a multi-byte sequence, so non-letters pass through untouched.
+"""
+
+import string
+from functools import lru_cache
+
+import numpy as np
+
+from modular_arithmetic import mod_inverse_or_none
+
+ALPHABET = string.ascii_uppercase
+
+# Number of distinct keys kept in the table caches
+TABLE_CACHE_SIZE = 512
+
+
+def clean_text(text):
+    """Remove spaces and convert to uppercase"""
+    return ''.join(text.upper().split())
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _affine_mapping(mult_key, add_key, decrypt):
+    """Return the 26-letter image of the alphabet under the affine map"""
+    if mod_inverse_or_none(mult_key, 26) is None:
+        raise ValueError("Multiplicative key must have an inverse in Z26")
+    if decrypt:
+        inv_key = mod_inverse_or_none(mult_key, 26)
+        return ''.join(ALPHABET[(inv_key * (i - add_key)) % 26] for i in range(26))
+    return ''.join(ALPHABET[(i * mult_key + add_key) % 26] for i in range(26))
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def affine_table(mult_key, add_key, decrypt=False):
+    """
+    Translation table for str.translate mapping A-Z through (a*x + b) mod 26.
+    With decrypt=True the inverse map a^(-1)(x - b) is returned instead.
+    Characters outside A-Z are not in the table and pass through unchanged.
+    """
+    return str.maketrans(ALPHABET, _affine_mapping(mult_key, add_key, decrypt))
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def affine_bytes_table(mult_key, add_key, decrypt=False):
+    """Same as affine_table, but as a 256-byte table for bytes.translate"""
+    return bytes.maketrans(ALPHABET.encode(),
+                           _affine_mapping(mult_key, add_key, decrypt).encode())
+
+
+def additive_table(key, decrypt=False):
+    """Translation table for the additive (Caesar) cipher"""
+    return affine_table(1, key % 26, decrypt)
+
+
+def multiplicative_table(key, decrypt=False):
+    """Translation table for the multiplicative cipher"""
+    if mod_inverse_or_none(key, 26) is None:
+        raise ValueError("Key must have a multiplicative inverse in Z26")
+    return affine_table(key % 26, 0, decrypt)
+
+
+def affine_translate(text, mult_key, add_key, decrypt=False):
+    """Clean text and run it through the affine translation table in one pass"""
+    return clean_text(text).translate(affine_table(mult_key % 26, add_key % 26, decrypt))
+
+
+# ---------- uint8 array helpers ----------
+
+def text_to_array(text):
+    """Encode text as a writable uint8 array (UTF-8 bytes)"""
+    return np.frombuffer(text.encode('utf-8'), dtype=np.uint8).copy()
+
+
+def array_to_text(arr):
+    """Decode a uint8 array produced by text_to_array back to str"""
+    return arr.tobytes().decode('utf-8')
+
+
+def letter_mask(arr):
+    """Boolean mask of the A-Z positions in a uint8 array"""
+    return (arr >= 65) & (arr <= 90)
+
+
+def keyword_shifts(keyword):
+    """Return the shifts (0-25) of a cleaned keyword as a uint8 array"""
+    keyword = clean_text(keyword)
+    if not keyword or not all(c in ALPHABET for c in keyword):
+        raise ValueError("Keyword must be a non-empty string of letters")
+    return np.frombuffer(keyword.encode('ascii'), dtype=np.uint8) - 65
+
+
+# ---------- Vigenere ----------
+
+def vigenere_array(arr, shifts, decrypt=False, offset=0):
+    """
+    Shift the A-Z bytes of arr in place by the repeating key shifts.
+    offset is the key index of the first letter; non-letters do not consume
+    a key letter. Returns the number of letters processed.
+    """
+    mask = letter_mask(arr)
+    if mask.all():
+        # Pure A-Z text: no gather/scatter through the mask needed
+        mask = slice(None)
+    letters = arr[mask]
+    count = letters.size
+    if count:
+        # Tile the key over the letter positions only
+        key = np.tile(np.roll(shifts, -(offset % len(shifts))),
+                      -(-count // len(shifts)))[:count]
+        if decrypt:
+            key = 26 - key
+        letters -= 65
+        letters += key
+        letters %= 26
+        letters += 65
+        arr[mask] = letters
+    return count
+
+
+def vigenere_transform(text, keyword, decrypt=False):
+    """Vigenere-encrypt (or decrypt) cleaned text with one modular add"""
+    arr = text_to_array(text)
+    vigenere_array(arr, keyword_shifts(keyword), decrypt)
+    return array_to_text(arr)
+
+
+# ---------- Autokey ----------
+
+def autokey_letters(arr):
+    """
+    Return the number of leading letters in arr. The autokey shift of every
+    letter after the first is the previous character, so a letter that follows
+    a non-letter cannot be processed.
+    """
+    mask = letter_mask(arr)
+    if np.any(mask[1:] & ~mask[:-1]):
+        raise ValueError("Autokey cipher needs a letter before every letter")
+    return int(np.argmin(mask)) if not mask.all() else mask.size
+
+
+def autokey_encrypt_values(values, key):
+    """Encrypt letter values (0-25): the first uses key, the rest the previous letter"""
+    shifts = np.empty_like(values)
+    shifts[:1] = key % 26
+    shifts[1:] = values[:-1]
+    return (values + shifts) % 26
+
+
+def autokey_decrypt_values(values, key):
+    """
+    Decrypt letter values (0-25). The recurrence p_i = c_i - p_(i-1) unrolls to
+    p_i = (-1)^i * (sum_(j<=i) (-1)^j c_j - key), an alternating cumulative sum.
+    """
+    sign = np.ones(values.size, dtype=np.int64)
+    sign[1::2] = -1
+    partial = np.cumsum(sign * values) - key
+    return (sign * partial) % 26
+
+
+def autokey_transform(text, key, decrypt=False):
+    """Autokey-encrypt (or decrypt) cleaned text without a Python-level loop"""
+    arr = text_to_array(text)
+    count = autokey_letters(arr)
+    values = arr[:count].astype(np.int64) - 65
+    if decrypt:
+        values = autokey_decrypt_values(values, key)
+    else:
+        values = autokey_encrypt_values(values, key)
+    arr[:count] = values + 65
+    return array_to_text(arr)
+
+
+# ---------- batches of short messages ----------
+
+# str.split() whitespace in ASCII, removed by clean_text
+_KEEP = np.ones(256, dtype=bool)
+_KEEP[np.frombuffer(b'\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f ', dtype=np.uint8)] = False
+
+
+def pack_messages(messages):
+    """
+    Clean and concatenate ASCII messages into one uint8 buffer.
+    Returns (buffer, offsets) where message i is buffer[offsets[i]:offsets[i+1]],
+    or None if any message is not ASCII.
+    """
+    joined = ''.join(messages)
+    if not joined.isascii():
+        return None
+    lengths = np.fromiter(map(len, messages), dtype=np.int64, count=len(messages))
+    arr = np.frombuffer(joined.upper().encode('ascii'), dtype=np.uint8)
+    keep = _KEEP[arr]
+    # Offsets after dropping whitespace = kept characters before each boundary
+    kept = np.concatenate([[0], np.cumsum(keep)])
+    offsets = kept[np.concatenate([[0], np.cumsum(lengths)])]
+    return arr[keep], offsets
+
+
+def unpack_messages(arr, offsets):
+    """Split a packed buffer back into a list of str"""
+    text = arr.tobytes().decode('ascii')
+    return list(map(text.__getitem__, map(slice, offsets[:-1].tolist(), offsets[1:].tolist())))
+
+
+def message_ids(offsets):
+    """Index of the message each buffer position belongs to"""
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def vigenere_batch(arr, offsets, shifts, decrypt=False):
+    """Vigenere over packed messages in place; the key restarts at every message"""
+    mask = letter_mask(arr)
+    letters_before = np.concatenate([[0], np.cumsum(mask)])
+    # Key index of each letter = its rank among the letters of its message
+    rank = letters_before[:-1] - letters_before[offsets[:-1]][message_ids(offsets)]
+    key = shifts[rank[mask] % len(shifts)]
+    if decrypt:
+        key = 26 - key
+    arr[mask] = (arr[mask] - 65 + key) % 26 + 65
+
+
+def autokey_batch(arr, offsets, key, decrypt=False):
+    """Autokey over packed messages in place; every message starts with key"""
+    mask = letter_mask(arr)
+    starts = np.zeros(len(arr), dtype=bool)
+    starts[offsets[:-1][offsets[:-1] < len(arr)]] = True
+    # Inside a message every letter needs a letter before it
+    if np.any(mask[1:] & ~mask[:-1] & ~starts[1:]):
+        raise ValueError("Autokey cipher needs a letter before every letter")
+    values = np.where(mask, arr.astype(np.int64) - 65, 0)
+    if decrypt:
+        # Per message: p_g = (-1)^g (T_g - T_(s-1)) - (-1)^(g-s) key
+        sign = np.ones(len(arr), dtype=np.int64)
+        sign[1::2] = -1
+        total = np.concatenate([[0], np.cumsum(sign * values)])
+        ids = message_ids(offsets)
+        s = offsets[:-1][ids]
+        local_sign = np.where((np.arange(len(arr)) - s) % 2, -1, 1)
+        out = sign * (total[1:] - total[s]) - local_sign * key
+    else:
+        shifts = np.empty_like(values)
+        shifts[1:] = values[:-1]
+        shifts[starts] = key
+        out = values + shifts
+    arr[mask] = out[mask] % 26 + 65
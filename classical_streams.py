@@ -0,0 +1,166 @@
+"""
+classical_streams.py
+
+Streaming (chunked) API for the classical ciphers.
+
+Each stream object has update(chunk) -> str and finalize() -> str. The key
+state that crosses chunk boundaries (Vigenere key index, autokey previous
+letter, Hill block remainder, Playfair digraph carry) is kept on the object,
+so feeding a text in any number of chunks produces exactly the same output as
+the one-shot functions in the cipher modules.
+
+Example:
+    stream = VigenereStream("DOLLARS")
+    with open("in.txt") as src, open("out.txt", "w") as dst:
+        dst.writelines(iter_stream(stream, src))
+"""
+
+from classical_engine import (clean_text, text_to_array, array_to_text, keyword_shifts,
+                              vigenere_array, autokey_letters, autokey_encrypt_values,
+                              autokey_decrypt_values)
+from hill_cipher import hill_encrypt, matrix_mod_inverse
+from playfair_cipher import get_playfair_cipher
+from transposition_cipher import transposition_encrypt, transposition_decrypt
+
+# Default number of characters read per chunk by iter_stream
+CHUNK_SIZE = 1 << 20
+
+
+class VigenereStream:
+    """Vigenere encryptor/decryptor that carries the key index between chunks"""
+
+    def __init__(self, keyword, decrypt=False):
+        self.shifts = keyword_shifts(keyword)
+        self.decrypt = decrypt
+        self.key_idx = 0
+
+    def update(self, chunk):
+        arr = text_to_array(clean_text(chunk))
+        letters = vigenere_array(arr, self.shifts, self.decrypt, self.key_idx)
+        self.key_idx = (self.key_idx + letters) % len(self.shifts)
+        return array_to_text(arr)
+
+    def finalize(self):
+        return ''
+
+
+class AutokeyStream:
+    """Autokey encryptor/decryptor that carries the previous plaintext letter"""
+
+    def __init__(self, key, decrypt=False):
+        self.decrypt = decrypt
+        # Shift for the next letter; None once the text ended on a non-letter
+        self.shift = key
+        self.started = False
+
+    def update(self, chunk):
+        arr = text_to_array(clean_text(chunk))
+        if not arr.size:
+            return ''
+        count = autokey_letters(arr)
+        if not count:
+            # Nothing to shift, and the text now ends on a non-letter
+            self.shift = None
+            self.started = True
+            return array_to_text(arr)
+        if self.started and self.shift is None:
+            raise ValueError("Autokey cipher needs a letter before every letter")
+        values = arr[:count].astype('int64') - 65
+        if self.decrypt:
+            values = autokey_decrypt_values(values, self.shift)
+            plain = values
+        else:
+            plain = values
+            values = autokey_encrypt_values(values, self.shift)
+        arr[:count] = values + 65
+        self.shift = int(plain[-1]) if count == arr.size else None
+        self.started = True
+        return array_to_text(arr)
+
+    def finalize(self):
+        return ''
+
+
+class HillStream:
+    """Hill encryptor/decryptor that carries the incomplete block between chunks"""
+
+    def __init__(self, key_matrix, decrypt=False):
+        self.n = len(key_matrix)
+        # Decryption is encryption with the inverse matrix, computed once
+        self.matrix = matrix_mod_inverse(key_matrix, 26) if decrypt else key_matrix
+        self.carry = ''
+
+    def update(self, chunk):
+        text = self.carry + clean_text(chunk)
+        full = len(text) - len(text) % self.n
+        self.carry = text[full:]
+        return hill_encrypt(text[:full], self.matrix) if full else ''
+
+    def finalize(self):
+        # The one-shot function pads the last block with 'X'
+        text, self.carry = self.carry, ''
+        return hill_encrypt(text, self.matrix) if text else ''
+
+
+class PlayfairStream:
+    """Playfair encryptor/decryptor that carries an unpaired letter to the next chunk"""
+
+    def __init__(self, key, decrypt=False):
+        self.cipher = get_playfair_cipher(clean_text(key))
+        self.decrypt = decrypt
+        self.carry = ''
+
+    def update(self, chunk):
+        text = self.carry + clean_text(chunk)
+        if self.decrypt:
+            full = len(text) - len(text) % 2
+            self.carry = text[full:]
+            return self.cipher.decrypt(text[:full])
+        letters, self.carry = self.cipher.prepare(text, final=False)
+        return self.cipher.encrypt_letters(letters)
+
+    def finalize(self):
+        text, self.carry = self.carry, ''
+        if not text:
+            return ''
+        return self.cipher.decrypt(text) if self.decrypt else self.cipher.encrypt(text)
+
+
+class TranspositionStream:
+    """
+    Columnar transposition encryptor/decryptor.
+
+    Every output column depends on the whole text, so the chunks are buffered
+    and the result is produced by finalize(). For texts that do not fit in
+    memory use transposition_encrypt_file / transposition_decrypt_file.
+    """
+
+    def __init__(self, keyword, decrypt=False):
+        self.keyword = keyword
+        self.decrypt = decrypt
+        self.chunks = []
+
+    def update(self, chunk):
+        # Decryption in transposition_cipher does not clean its input
+        self.chunks.append(chunk if self.decrypt else clean_text(chunk))
+        return ''
+
+    def finalize(self):
+        text, self.chunks = ''.join(self.chunks), []
+        if self.decrypt:
+            return transposition_decrypt(text, self.keyword)
+        return transposition_encrypt(text, self.keyword)
+
+
+def iter_stream(stream, fileobj, chunk_size=CHUNK_SIZE):
+    """Feed a text-mode file object through stream, yielding the output pieces"""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        out = stream.update(chunk)
+        if out:
+            yield out
+    out = stream.finalize()
+    if out:
+        yield out
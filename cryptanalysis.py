@@ -1,43 +1,622 @@
+import os
 import string
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from itertools import permutations
+from math import gcd
+import numpy as np
+from classical_engine import (affine_table, text_to_array, letter_mask, vigenere_transform,
+                              message_ids)
+from hill_cipher import matrix_mod_inverse, gauss_jordan_mod
+from modular_arithmetic import mod_inverse_or_none as mod_inverse, inverse_table
+
+# Relative frequencies of the letters A-Z in English text
+ENGLISH_FREQUENCIES = np.array([
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153,
+    0.772, 4.025, 2.406, 6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056,
+    2.758, 0.978, 2.360, 0.150, 1.974, 0.074]) / 100
+LOG_ENGLISH_FREQUENCIES = np.log(ENGLISH_FREQUENCIES)
+
+# Index of coincidence of English text and of uniformly random letters
+ENGLISH_IOC = float((ENGLISH_FREQUENCIES ** 2).sum())
+RANDOM_IOC = 1 / 26
+
+# Most common English bigrams, percent of all bigrams
+ENGLISH_BIGRAMS = {
+    'TH': 3.56, 'HE': 3.07, 'IN': 2.43, 'ER': 2.05, 'AN': 1.99, 'RE': 1.85, 'ON': 1.76,
+    'AT': 1.49, 'EN': 1.45, 'ND': 1.35, 'TI': 1.34, 'ES': 1.34, 'OR': 1.28, 'TE': 1.20,
+    'OF': 1.17, 'ED': 1.17, 'IS': 1.13, 'IT': 1.12, 'AL': 1.09, 'AR': 1.07, 'ST': 1.05,
+    'TO': 1.04, 'NT': 1.04, 'NG': 0.95, 'SE': 0.93, 'HA': 0.93, 'AS': 0.87, 'OU': 0.87,
+    'IO': 0.83, 'LE': 0.83, 'VE': 0.83, 'CO': 0.79, 'ME': 0.79, 'DE': 0.76, 'HI': 0.76,
+    'RI': 0.73, 'RO': 0.73, 'IC': 0.70, 'NE': 0.69, 'EA': 0.69, 'RA': 0.69, 'CE': 0.65,
+    'LI': 0.62, 'CH': 0.60, 'LL': 0.58, 'BE': 0.58, 'MA': 0.57, 'SI': 0.55, 'OM': 0.55,
+    'UR': 0.54,
+}
+
+# The 12 multiplicative keys with an inverse mod 26
+AFFINE_MULT_KEYS = [a for a in range(1, 26) if gcd(a, 26) == 1]
+
+# Inverse of every residue mod 26 (0 where there is none)
+INVERSES_26 = np.array(inverse_table(26))
+
+# Ciphers handled by the known-plaintext solver
+KNOWN_PLAINTEXT_CIPHERS = ('additive', 'affine', 'vigenere', 'hill')
+
+# Longest Vigenere period searched for when the known-plaintext solver is not
+# given one; each candidate period is one pass over the packed pairs
+MAX_KEY_PERIOD = 32
 
 def clean_text(text):
     """Remove spaces and convert to uppercase"""
     return ''.join(text.upper().split())
 
-def mod_inverse(a, m):
-    """Find modular multiplicative inverse"""
-    for x in range(1, m):
-        if ((a % m) * (x % m)) % m == 1:
-            return x
-    return None
-
 def additive_decrypt(ciphertext, key):
     """Decrypt using additive cipher with given key"""
-    alphabet = string.ascii_uppercase
-    plaintext = ''
-    for char in ciphertext:
-        if char in alphabet:
-            idx = (alphabet.index(char) - key) % 26
-            plaintext += alphabet[idx]
-        else:
-            plaintext += char
-    return plaintext
+    return ciphertext.translate(affine_table(1, key % 26, decrypt=True))
 
 def affine_decrypt(ciphertext, mult_key, add_key):
     """Decrypt using affine cipher with given keys"""
-    alphabet = string.ascii_uppercase
-    inv_key = mod_inverse(mult_key, 26)
-    if inv_key is None:
+    if mod_inverse(mult_key, 26) is None:
         return None
-    
-    plaintext = ''
-    for char in ciphertext:
-        if char in alphabet:
-            idx = (inv_key * (alphabet.index(char) - add_key)) % 26
-            plaintext += alphabet[idx]
-        else:
-            plaintext += char
-    return plaintext
+    return ciphertext.translate(affine_table(mult_key % 26, add_key % 26, decrypt=True))
+
+def letter_values(text):
+    """Return the A-Z letters of text as an int64 array of values 0-25"""
+    arr = text_to_array(text)
+    return arr[letter_mask(arr)].astype(np.int64) - 65
+
+def score_counts(counts, method='chi2'):
+    """
+    Score letter histograms against English, one row per candidate (k x 26).
+    Higher is better: 'chi2' returns the negated chi-squared statistic,
+    'loglik' the log-likelihood of the letters under English frequencies.
+    """
+    counts = np.atleast_2d(counts).astype(np.float64)
+    if method == 'loglik':
+        return counts @ LOG_ENGLISH_FREQUENCIES
+    if method != 'chi2':
+        raise ValueError("method must be 'chi2' or 'loglik'")
+    expected = counts.sum(axis=1, keepdims=True) * ENGLISH_FREQUENCIES
+    return -(((counts - expected) ** 2) / np.maximum(expected, 1e-12)).sum(axis=1)
+
+def rank_affine_keys(ciphertext, top_k=5, method='chi2', additive_only=False):
+    """
+    Score every affine key (312, or the 26 additive keys) at once and return
+    the top_k candidates as a ranked list of (key, plaintext, score).
+    Decrypting under key (a, b) sends ciphertext letter a*p + b to p, so the
+    plaintext histogram of every candidate is the ciphertext histogram
+    gathered through a (keys x 26) index array; no candidate text is built
+    until the final top_k are decrypted.
+    """
+    counts = np.bincount(letter_values(ciphertext), minlength=26)
+    mults = np.array([1] if additive_only else AFFINE_MULT_KEYS)
+    a = np.repeat(mults, 26)
+    b = np.tile(np.arange(26), len(mults))
+    encrypt_map = (a[:, None] * np.arange(26)[None, :] + b[:, None]) % 26
+    scores = score_counts(counts[encrypt_map], method)
+    best = np.argsort(-scores, kind='stable')[:top_k]
+    results = []
+    for i in best:
+        key = int(b[i]) if additive_only else (int(a[i]), int(b[i]))
+        plaintext = ciphertext.translate(affine_table(int(a[i]), int(b[i]), decrypt=True))
+        results.append((key, plaintext, float(scores[i])))
+    return results
+
+def rank_additive_keys(ciphertext, top_k=5, method='chi2'):
+    """Ranked (key, plaintext, score) list over the 26 additive keys"""
+    return rank_affine_keys(ciphertext, top_k, method, additive_only=True)
+
+def periodic_ioc(values, max_period):
+    """
+    Average index of coincidence of the columns when the letter values are
+    written in rows of length 1..max_period (index 0 is unused).
+    One np.bincount per period builds all column histograms at once.
+    """
+    iocs = np.zeros(max_period + 1)
+    positions = np.arange(len(values))
+    for period in range(1, max_period + 1):
+        counts = np.bincount((positions % period) * 26 + values,
+                             minlength=period * 26).reshape(period, 26)
+        n = counts.sum(axis=1)
+        valid = n > 1
+        if valid.any():
+            pairs = (counts * (counts - 1)).sum(axis=1)[valid]
+            iocs[period] = (pairs / (n * (n - 1))[valid]).mean()
+    return iocs
+
+def kasiski_scores(values, max_period):
+    """
+    Kasiski examination: distances between repeated trigrams, scored per
+    period as (fraction of distances divisible by it) * period, so a value
+    near 1 means no evidence and larger values point to the key length.
+    """
+    scores = np.zeros(max_period + 1)
+    if len(values) < 6:
+        return scores
+    trigrams = values[:-2] * 676 + values[1:-1] * 26 + values[2:]
+    order = np.argsort(trigrams, kind='stable')
+    repeated = trigrams[order[1:]] == trigrams[order[:-1]]
+    distances = (order[1:] - order[:-1])[repeated]
+    if len(distances):
+        for period in range(2, max_period + 1):
+            scores[period] = np.count_nonzero(distances % period == 0) / len(distances) * period
+    return scores
+
+def estimate_key_lengths(values, max_key_length=20, top=3):
+    """Most likely Vigenere key lengths, from periodic IoC and Kasiski evidence"""
+    max_key_length = max(1, min(max_key_length, len(values) // 2))
+    ioc = periodic_ioc(values, max_key_length)
+    kasiski = kasiski_scores(values, max_key_length)
+    # 0 for random letters, 1 for English-like columns
+    fit = (ioc[1:] - RANDOM_IOC) / (ENGLISH_IOC - RANDOM_IOC)
+    bonus = np.clip(kasiski[1:] - 1, 0, None) / max(kasiski.max(), 1)
+    score = fit + 0.1 * bonus
+    # Multiples of the key length score just as well, so the shortest length
+    # close to the best score comes first, then the rest by score
+    threshold = 0.7 * score.max()
+    shortest = [L for L in range(1, max_key_length + 1) if score[L - 1] >= threshold][:1]
+    ranked = shortest + [int(L) + 1 for L in np.argsort(-score, kind='stable')
+                         if int(L) + 1 not in shortest]
+    # A multiple of a better-ranked length only overfits the same key
+    lengths = []
+    for L in ranked:
+        if not any(L % shorter == 0 for shorter in lengths):
+            lengths.append(L)
+    return lengths[:top]
+
+def vigenere_key_for_length(values, key_length, method='chi2'):
+    """Recover each key letter by fitting its column's histogram to English"""
+    counts = np.bincount((np.arange(len(values)) % key_length) * 26 + values,
+                         minlength=key_length * 26).reshape(key_length, 26)
+    # Column counts after subtracting shift k: counts[col, (p + k) % 26]
+    gather = (np.arange(26)[None, :] + np.arange(26)[:, None]) % 26
+    shifted = counts[:, gather]
+    scores = score_counts(shifted.reshape(-1, 26), method).reshape(key_length, 26)
+    return ''.join(chr(65 + int(k)) for k in scores.argmax(axis=1))
+
+def _shortest_period(keyword):
+    """Reduce a keyword that repeats a shorter one (e.g. KEYKEY -> KEY)"""
+    for d in range(1, len(keyword)):
+        if len(keyword) % d == 0 and keyword == keyword[:d] * (len(keyword) // d):
+            return keyword[:d]
+    return keyword
+
+def solve_vigenere(ciphertext, max_key_length=20, top_k=3, method='chi2'):
+    """
+    Ciphertext-only attack on the Vigenere cipher.
+    Returns a ranked list of (keyword, plaintext, score), best first.
+    """
+    text = clean_text(ciphertext)
+    values = letter_values(text)
+    if not len(values):
+        return []
+    candidates = {}
+    for key_length in estimate_key_lengths(values, max_key_length, top=max(top_k, 3)):
+        keyword = _shortest_period(vigenere_key_for_length(values, key_length, method))
+        if keyword in candidates:
+            continue
+        plaintext = vigenere_transform(text, keyword, decrypt=True)
+        score = float(score_counts(np.bincount(letter_values(plaintext), minlength=26),
+                                   method)[0])
+        candidates[keyword] = (keyword, plaintext, score)
+    return sorted(candidates.values(), key=lambda c: -c[2])[:top_k]
+
+def score_vigenere_words(words, prefix, min_ioc, top_k, method='chi2'):
+    """
+    Try every keyword in words (uppercase A-Z strings) on the letter values
+    of a ciphertext prefix. Keywords of one length are decrypted together as
+    a (words x prefix) array; rows whose index of coincidence is below
+    min_ioc are dropped before the survivors are scored against English.
+    Returns the best top_k (score, keyword) pairs.
+    """
+    best = []
+    positions = np.arange(len(prefix))
+    by_length = {}
+    for word in words:
+        by_length.setdefault(len(word), []).append(word)
+    for length, group in by_length.items():
+        codes = np.frombuffer(''.join(group).encode('ascii'), dtype=np.uint8).reshape(-1, length)
+        keys = codes.astype(np.int64) - 65
+        plain = (prefix + 26 - keys[:, positions % length]) % 26
+        rows = np.arange(len(group))[:, None]
+        counts = np.bincount((rows * 26 + plain).reshape(-1),
+                             minlength=len(group) * 26).reshape(-1, 26)
+        ioc = (counts * (counts - 1)).sum(axis=1) / max(len(prefix) * (len(prefix) - 1), 1)
+        survivors = np.flatnonzero(ioc >= min_ioc)
+        if not len(survivors):
+            continue
+        scores = score_counts(counts[survivors], method)
+        for i in np.argsort(-scores, kind='stable')[:top_k]:
+            best.append((float(scores[i]), group[survivors[i]]))
+    best.sort(key=lambda b: -b[0])
+    return best[:top_k]
+
+def _read_words(wordlist, batch_size):
+    """Yield batches of cleaned A-Z words from a wordlist path or iterable"""
+    lines = open(wordlist) if isinstance(wordlist, str) else wordlist
+    try:
+        batch = []
+        for line in lines:
+            word = line.strip().upper()
+            if word.isascii() and word.isalpha():
+                batch.append(word)
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+    finally:
+        if lines is not wordlist:
+            lines.close()
+
+def dictionary_attack_vigenere(ciphertext, wordlist, top_k=3, prefix_length=120,
+                               min_ioc=None, method='chi2', workers=None,
+                               batch_size=50000):
+    """
+    Dictionary attack on a Vigenere ciphertext with a real-word key.
+    wordlist is a file path (one word per line) or an iterable of words; it
+    is streamed in batches to a process pool, where every word is tried on
+    the first prefix_length letters only. Candidates whose prefix index of
+    coincidence is below min_ioc (default: halfway between random and
+    English) are dropped, and the best survivors are decrypted in full.
+    Returns a ranked list of (keyword, plaintext, score).
+    """
+    text = clean_text(ciphertext)
+    values = letter_values(text)
+    if not len(values):
+        return []
+    prefix = values[:prefix_length]
+    if min_ioc is None:
+        min_ioc = (ENGLISH_IOC + RANDOM_IOC) / 2
+    workers = workers or os.cpu_count()
+    best = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded number of batches in flight while the list is read
+        limit = 2 * workers
+        pending = set()
+        for batch in _read_words(wordlist, batch_size):
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    best.extend(future.result())
+            pending.add(pool.submit(score_vigenere_words, batch, prefix, min_ioc, top_k, method))
+        for future in pending:
+            best.extend(future.result())
+    best.sort(key=lambda b: -b[0])
+    results = []
+    for _, keyword in best[:top_k]:
+        plaintext = vigenere_transform(text, keyword, decrypt=True)
+        score = float(score_counts(np.bincount(letter_values(plaintext), minlength=26),
+                                   method)[0])
+        results.append((keyword, plaintext, score))
+    results.sort(key=lambda r: -r[2])
+    return results
+
+def solve_autokey(ciphertext, top_k=3, method='chi2'):
+    """
+    Ciphertext-only attack on the autokey cipher: the key is a single shift,
+    so all 26 decryptions are made at once (one alternating cumulative sum)
+    and ranked by letter frequency. Returns a ranked list of
+    (key, plaintext, score).
+    """
+    values = letter_values(clean_text(ciphertext))
+    if not len(values):
+        return []
+    sign = np.ones(len(values), dtype=np.int64)
+    sign[1::2] = -1
+    partial = np.cumsum(sign * values)
+    # p_i = (-1)^i * (sum_(j<=i) (-1)^j c_j - key) for every key at once
+    plains = (sign * (partial[None, :] - np.arange(26)[:, None])) % 26
+    counts = np.apply_along_axis(np.bincount, 1, plains, minlength=26)
+    scores = score_counts(counts, method)
+    results = []
+    for key in np.argsort(-scores, kind='stable')[:top_k]:
+        plaintext = ''.join(chr(65 + int(v)) for v in plains[key])
+        results.append((int(key), plaintext, float(scores[key])))
+    return results
+
+@lru_cache(maxsize=None)
+def bigram_log_table():
+    """
+    Log-probabilities of all 676 bigrams as a flat array indexed by a*26 + b.
+    Listed bigrams use their measured frequency; the rest share the remaining
+    mass in proportion to the product of their letter frequencies.
+    """
+    listed = np.zeros(676)
+    for bigram, percent in ENGLISH_BIGRAMS.items():
+        listed[(ord(bigram[0]) - 65) * 26 + ord(bigram[1]) - 65] = percent / 100
+    independent = np.outer(ENGLISH_FREQUENCIES, ENGLISH_FREQUENCIES).reshape(-1)
+    independent[listed > 0] = 0
+    table = np.log(listed + independent / independent.sum() * (1 - listed.sum()))
+    # Shared by every caller through the cache, so it must not be modified
+    table.flags.writeable = False
+    return table
+
+def bigram_score(values):
+    """Mean bigram log-probability of a letter value array"""
+    if len(values) < 2:
+        return float('-inf')
+    return float(bigram_log_table()[values[:-1] * 26 + values[1:]].mean())
+
+def _hill_candidate_rows(n):
+    """All 26^n rows that can belong to an invertible matrix mod 26"""
+    rows = (np.arange(26 ** n)[:, None] // 26 ** np.arange(n - 1, -1, -1)) % 26
+    # A row of even numbers (or of multiples of 13) makes the determinant non-invertible
+    usable = (rows % 2).any(axis=1) & (rows % 13).any(axis=1)
+    return rows[usable]
+
+def hill_row_scores(values, n, method='chi2', batch=4096):
+    """
+    Score every candidate decryption-matrix row against all ciphertext blocks.
+    Row r of K^-1 produces letter r of every plaintext block, so each row can be
+    judged on its own by the letter frequencies it yields. Candidates are
+    evaluated in batches with one matmul each. Returns (rows, scores).
+    """
+    blocks = values[:len(values) // n * n].reshape(-1, n).T.astype(np.float32)
+    rows = _hill_candidate_rows(n)
+    scores = np.empty(len(rows))
+    for start in range(0, len(rows), batch):
+        chunk = rows[start:start + batch]
+        out = np.fmod(chunk.astype(np.float32) @ blocks, 26).astype(np.int64)
+        counts = np.bincount((np.arange(len(chunk))[:, None] * 26 + out).reshape(-1),
+                             minlength=len(chunk) * 26).reshape(len(chunk), 26)
+        scores[start:start + batch] = score_counts(counts, method)
+    return rows, scores
+
+def solve_hill(ciphertext, n=2, top_rows=8, top_k=3, method='chi2'):
+    """
+    Ciphertext-only attack on the Hill cipher with an n x n key.
+    The best top_rows candidate rows of K^-1 are combined in every order into
+    invertible matrices, and the resulting plaintexts are ranked by bigram
+    fitness. Returns a ranked list of (key_matrix, plaintext, score).
+    """
+    values = letter_values(clean_text(ciphertext))
+    values = values[:len(values) // n * n]
+    if not len(values):
+        return []
+    rows, scores = hill_row_scores(values, n, method)
+    best_rows = rows[np.argsort(-scores, kind='stable')[:top_rows]]
+    blocks = values.reshape(-1, n).T
+    results = []
+    for combo in permutations(range(len(best_rows)), n):
+        inverse = best_rows[list(combo)]
+        try:
+            key = matrix_mod_inverse(inverse, 26)
+        except ValueError:
+            continue
+        plain = ((inverse @ blocks) % 26).T.reshape(-1)
+        results.append((key, ''.join(chr(65 + int(v)) for v in plain), bigram_score(plain)))
+    results.sort(key=lambda r: -r[2])
+    return results[:top_k]
+
+def column_adjacency(values, width):
+    """
+    Bigram fitness of every ordered pair of ciphertext columns for a columnar
+    transposition of the given width: adjacency[a, b] is the summed bigram
+    log-probability of column a followed by column b, row by row.
+    """
+    columns = values.reshape(width, -1)
+    table = bigram_log_table().reshape(26, 26)
+    adjacency = np.empty((width, width))
+    for a in range(width):
+        adjacency[a] = table[columns[a][None, :], columns].sum(axis=1)
+    return adjacency
+
+def best_column_orders(adjacency, beam_width=2000, top_k=3):
+    """
+    Beam search for the column sequences with the highest total adjacency.
+    Partial paths that used the same set of columns and end in the same column
+    are merged (only the best survives), as in the Held-Karp TSP recursion.
+    Returns up to top_k (sequence, score) pairs, best first.
+    """
+    width = len(adjacency)
+    paths = np.arange(width)[:, None]
+    used = np.left_shift(1, np.arange(width, dtype=np.int64))
+    scores = np.zeros(width)
+    for _ in range(width - 1):
+        last = paths[:, -1]
+        candidates = scores[:, None] + adjacency[last]
+        candidates[(used[:, None] >> np.arange(width)) & 1 == 1] = -np.inf
+        beam, column = np.divmod(np.argsort(-candidates, axis=None, kind='stable'), width)
+        keep = np.isfinite(candidates[beam, column])
+        beam, column = beam[keep], column[keep]
+        # Merge paths that reach the same (column set, last column) state
+        state = (used[beam] | (1 << column)) * width + column
+        _, first = np.unique(state, return_index=True)
+        first = np.sort(first)[:beam_width]
+        beam, column = beam[first], column[first]
+        paths = np.hstack([paths[beam], column[:, None]])
+        used = used[beam] | (1 << column)
+        scores = candidates[beam, column]
+    return [(paths[i], scores[i]) for i in range(min(top_k, len(paths)))]
+
+def solve_transposition(ciphertext, min_width=2, max_width=15, beam_width=2000, top_k=3):
+    """
+    Ciphertext-only attack on the columnar transposition cipher.
+    Every width that divides the ciphertext length is tried; the column order
+    is found by beam search over the column adjacency matrix and the
+    decryptions of all widths are ranked by bigram fitness.
+    Returns a ranked list of (keyword, plaintext, score) where keyword can be
+    passed to transposition_decrypt.
+    """
+    from transposition_cipher import transposition_decrypt
+    ciphertext = clean_text(ciphertext)
+    values = letter_values(ciphertext)
+    if len(values) != len(ciphertext):
+        raise ValueError("Transposition ciphertext must contain only letters")
+    results = []
+    # Keywords are spelled with distinct letters, so at most 26 columns
+    for width in range(max(min_width, 2), min(max_width, 26) + 1):
+        if len(values) % width:
+            continue
+        adjacency = column_adjacency(values, width)
+        for sequence, _ in best_column_orders(adjacency, beam_width, top_k):
+            # Ciphertext block k holds plaintext column order[k]
+            order = np.empty(width, dtype=np.int64)
+            order[sequence] = np.arange(width)
+            keyword = ''.join(chr(65 + int(c)) for c in order)
+            plaintext = transposition_decrypt(ciphertext, keyword)
+            results.append((keyword, plaintext, bigram_score(letter_values(plaintext))))
+    results.sort(key=lambda r: -r[2])
+    return results[:top_k]
+
+def _pack_pairs(pairs):
+    """
+    Letter values of (plaintext, ciphertext) pairs packed end to end.
+    Returns (plain, cipher, offsets, usable) where pair i is
+    [offsets[i]:offsets[i+1]]; a pair whose letter counts differ (or that
+    has no letters) is left empty and marked unusable.
+    """
+    plains = [letter_values(clean_text(p)) for p, _ in pairs]
+    ciphers = [letter_values(clean_text(c)) for _, c in pairs]
+    usable = np.array([len(p) == len(c) and len(p) > 0 for p, c in zip(plains, ciphers)],
+                      dtype=bool)
+    lengths = np.array([len(p) if ok else 0 for p, ok in zip(plains, usable)], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    empty = np.empty(0, dtype=np.int64)
+    plain = np.concatenate([p for p, ok in zip(plains, usable) if ok] or [empty])
+    cipher = np.concatenate([c for c, ok in zip(ciphers, usable) if ok] or [empty])
+    return plain, cipher, offsets, usable
+
+def _consistent(matches, ids, count):
+    """True for every pair whose positions all match"""
+    return np.bincount(ids[~matches], minlength=count) == 0
+
+def recover_additive_keys(plain, cipher, offsets, usable):
+    """Additive key of every packed pair: k = c - p at the first letter"""
+    if not len(plain):
+        return [None] * len(usable)
+    ids = message_ids(offsets)
+    shifts = (cipher - plain) % 26
+    key = shifts[np.minimum(offsets[:-1], len(plain) - 1)]
+    ok = usable & _consistent(shifts == key[ids], ids, len(usable))
+    return [int(k) if good else None for k, good in zip(key, ok)]
+
+def recover_affine_keys(plain, cipher, offsets, usable):
+    """
+    Affine key (a, b) of every packed pair. With p0 the first letter and pj
+    the first letter where pj - p0 is invertible mod 26:
+        a = (cj - c0) * (pj - p0)^-1,  b = c0 - a * p0
+    Pairs without such a letter are settled by testing the 12 values of a;
+    a key is returned only when exactly one is consistent.
+    """
+    count = len(usable)
+    if not len(plain):
+        return [None] * count
+    ids = message_ids(offsets)
+    start = np.minimum(offsets[:-1], len(plain) - 1)
+    diff = (plain - plain[start][ids]) % 26
+    invertible = INVERSES_26[diff] > 0
+    # First position of each pair with an invertible difference
+    first = np.full(count, len(plain), dtype=np.int64)
+    np.minimum.at(first, ids[invertible], np.flatnonzero(invertible))
+    solved = usable & (first < len(plain))
+    j = np.where(solved, first, start)
+    a = (cipher[j] - cipher[start]) * INVERSES_26[diff[j]] % 26
+    b = (cipher[start] - a * plain[start]) % 26
+    ok = solved & _consistent((a[ids] * plain + b[ids]) % 26 == cipher, ids, count)
+    # No invertible difference: the 12 possible values of a decide
+    unsolved = usable & ~solved
+    if unsolved.any():
+        found = np.zeros(count, dtype=np.int64)
+        for mult in AFFINE_MULT_KEYS:
+            add = (cipher[start] - mult * plain[start]) % 26
+            fits = unsolved & _consistent((mult * plain + add[ids]) % 26 == cipher, ids, count)
+            a, b = np.where(fits, mult, a), np.where(fits, add, b)
+            found += fits
+        ok |= found == 1
+    return [(int(x), int(y)) if good else None for x, y, good in zip(a, b, ok)]
+
+def recover_vigenere_keys(plain, cipher, offsets, usable, period=None,
+                          max_period=MAX_KEY_PERIOD):
+    """
+    Vigenere keyword of every packed pair. The shift at letter i is c - p and
+    must repeat with the key period. When period is None the shortest period
+    up to max_period consistent with the known text is used, which costs
+    max_period passes over the pairs. A pair with no such period gets its
+    whole shift sequence as the key (a running key, or a keyword longer than
+    max_period or than half the known text).
+    """
+    count = len(usable)
+    ids = message_ids(offsets)
+    shifts = (cipher - plain) % 26
+    rank = np.arange(len(shifts)) - offsets[:-1][ids]
+    lengths = np.diff(offsets)
+    if period is None:
+        # Smallest t with shifts[i] == shifts[i + t] inside every pair
+        periods = lengths.copy()
+        pending = usable.copy()
+        for t in range(1, min(int(lengths.max(initial=0)), max_period + 1)):
+            if not pending.any():
+                break
+            same = ids[:-t] == ids[t:]
+            bad = np.bincount(ids[:-t][same & (shifts[:-t] != shifts[t:])], minlength=count)
+            found = pending & (bad == 0) & (t < lengths)
+            periods[found] = t
+            pending &= ~found
+    else:
+        periods = np.full(count, period, dtype=np.int64)
+    periods = np.maximum(periods, 1)
+    # Fold every shift onto its key position; all shifts at one position must agree
+    width = int(periods.max(initial=1))
+    key = np.full((count, width), -1, dtype=np.int64)
+    residue = rank % periods[ids]
+    key[ids, residue] = shifts
+    ok = usable & _consistent(key[ids, residue] == shifts, ids, count)
+    ok &= (key >= 0).sum(axis=1) >= periods
+    return [''.join(chr(65 + int(v)) for v in row[:p]) if good else None
+            for row, p, good in zip(key, periods, ok)]
+
+def recover_hill_key(plain, cipher, n=2):
+    """
+    Hill key of one pair of letter value arrays. Every block gives the row
+    equation p^T K^T = c^T; Gauss-Jordan mod 26 on the stacked rows [P | C]
+    turns the top n rows into [I | K^T]. Returns None if the plaintext
+    blocks do not determine the key or the key does not fit every block.
+    """
+    if len(cipher) % n or len(plain) > len(cipher) or len(cipher) - len(plain) >= n:
+        return None
+    # hill_encrypt pads the last block with 'X'
+    plain = np.concatenate([plain, np.full(len(cipher) - len(plain), 23, dtype=np.int64)])
+    blocks_p, blocks_c = plain.reshape(-1, n), cipher.reshape(-1, n)
+    rows = np.hstack([blocks_p, blocks_c]).tolist()
+    try:
+        rows = gauss_jordan_mod(rows, n, 26)
+    except ValueError:
+        return None
+    key = np.array([row[n:] for row in rows[:n]], dtype=np.int64).T
+    if not np.array_equal(blocks_p @ key.T % 26, blocks_c):
+        return None
+    return key
+
+def recover_keys(cipher, pairs, period=None, n=2, max_period=MAX_KEY_PERIOD):
+    """
+    Known-plaintext key recovery for a batch of (plaintext, ciphertext) pairs.
+    cipher is one of KNOWN_PLAINTEXT_CIPHERS. The additive, affine and
+    Vigenere keys of all pairs are solved together in closed form; Hill keys
+    by Gauss-Jordan elimination mod 26 (n is the block size). Without a
+    period, Vigenere periods up to max_period are tried. Returns one key
+    per pair (int, (a, b), keyword or matrix), or None where the pair does not
+    determine a consistent key.
+    """
+    if cipher == 'hill':
+        keys = []
+        for p, c in pairs:
+            keys.append(recover_hill_key(letter_values(clean_text(p)),
+                                         letter_values(clean_text(c)), n))
+        return keys
+    packed = _pack_pairs(pairs)
+    if cipher == 'additive':
+        return recover_additive_keys(*packed)
+    if cipher == 'affine':
+        return recover_affine_keys(*packed)
+    if cipher == 'vigenere':
+        return recover_vigenere_keys(*packed, period=period, max_period=max_period)
+    raise ValueError(f"Unsupported cipher: {cipher} (choose from {', '.join(KNOWN_PLAINTEXT_CIPHERS)})")
+
+def recover_key(cipher, plaintext, ciphertext, period=None, n=2, max_period=MAX_KEY_PERIOD):
+    """Known-plaintext key recovery for a single pair (see recover_keys)"""
+    return recover_keys(cipher, [(plaintext, ciphertext)], period, n, max_period)[0]
 
 def brute_force_additive(ciphertext, known_plain=None, known_cipher=None, birthday_hint=None):
     """
@@ -87,6 +666,12 @@ def brute_force_affine(ciphertext, known_plain="ab", known_cipher="GL"):
     known_plain = clean_text(known_plain)
     known_cipher = clean_text(known_cipher)
     
+    # Closed form when the pair determines a single key
+    key = recover_key('affine', known_plain, known_cipher)
+    if key is not None:
+        decrypted = affine_decrypt(ciphertext, *key)
+        return [(key, decrypted)] if decrypted else []
+    
     # Get indices
     p1, p2 = [alphabet.index(c) for c in known_plain]
     c1, c2 = [alphabet.index(c) for c in known_cipher]
@@ -122,4 +707,44 @@ if __name__ == "__main__":
     print("\nBrute force attack on affine cipher with known plaintext 'ab' -> 'GL':")
     solutions = brute_force_affine(ciphertext)
     for keys, plaintext in solutions:
-        print(f"Keys a={keys[0]}, b={keys[1]}: {plaintext}")
\ No newline at end of file
+        print(f"Keys a={keys[0]}, b={keys[1]}: {plaintext}")
+    
+    # Ciphertext-only: rank all 312 affine keys by fit to English
+    print("\nTop affine keys ranked by chi-squared against English:")
+    for keys, plaintext, score in rank_affine_keys(ciphertext, top_k=3):
+        print(f"Keys a={keys[0]}, b={keys[1]} (score {score:.1f}): {plaintext}")
+    
+    # Vigenere ciphertext-only attack (key length from IoC / Kasiski)
+    from vigenere_cipher import vigenere_encrypt
+    message = ("Cryptanalysis of the Vigenere cipher starts by finding the length of the "
+               "keyword. Once the length is known, every column of the ciphertext is a "
+               "simple Caesar cipher, and each of those can be broken by comparing its "
+               "letter frequencies with the frequencies of ordinary English text. The "
+               "index of coincidence and the distances between repeated fragments both "
+               "reveal the period of the key.")
+    ciphertext = vigenere_encrypt(message, "LEMON")
+    print("\nVigenere attack on:", ciphertext[:40] + "...")
+    for keyword, plaintext, score in solve_vigenere(ciphertext, top_k=1):
+        print(f"Keyword {keyword} (score {score:.1f}): {plaintext}")
+    
+    # Vigenere dictionary attack (wordlist may also be a file path)
+    print("\nDictionary attack with a small wordlist:")
+    words = ["ORANGE", "APPLE", "LEMON", "CHERRY", "MELON"]
+    for keyword, plaintext, score in dictionary_attack_vigenere(ciphertext, words, top_k=1):
+        print(f"Keyword {keyword} (score {score:.1f}): {plaintext}")
+    
+    # Hill cipher ciphertext-only attack (row-by-row search)
+    from hill_cipher import hill_encrypt
+    key_matrix = np.array([[3, 3], [2, 7]])
+    ciphertext = hill_encrypt(''.join(c for c in message if c.isalpha()), key_matrix)
+    print("\nHill attack on:", ciphertext[:40] + "...")
+    for key, plaintext, score in solve_hill(ciphertext, n=2, top_k=1):
+        print(f"Key {key.tolist()} (score {score:.2f}): {plaintext}")
+    
+    # Columnar transposition attack (beam search over column adjacency)
+    from transposition_cipher import transposition_encrypt
+    # About 45 rows: enough for the column adjacency statistics of a 7-letter key
+    ciphertext = transposition_encrypt(message.replace('.', '').replace(',', ''), "KEYWORD")
+    print("\nTransposition attack on:", ciphertext[:40] + "...")
+    for keyword, plaintext, score in solve_transposition(ciphertext, top_k=1):
+        print(f"Keyword {keyword} (score {score:.2f}): {plaintext}")
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+cryptanalysis_jobs.py
+
+Job layer for the cryptanalysis solvers.
+
+JobScheduler runs solver calls for many ciphertexts in a bounded process
+pool. Results stream back in completion order (with progress callbacks) and
+pending jobs can be cancelled. Finished results are stored in an on-disk
+ResultCache keyed by a SHA-256 hash of (solver, options, cleaned ciphertext),
+so a resubmitted or duplicate ciphertext is answered without running the
+solver again; duplicates inside one batch share a single pool task.
+
+Results are stored as JSON, so tuples come back as lists and NumPy arrays
+(Hill keys) as nested lists - the same shape whether or not the cache was hit.
+
+Example:
+    with JobScheduler(cache_dir='.cryptanalysis_cache') as scheduler:
+        jobs = scheduler.submit_many('auto', ciphertexts)
+        for job in scheduler.as_completed(jobs, on_progress=print):
+            print(job.index, job.solver, job.best)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed as _as_completed
+
+import numpy as np
+
+from cryptanalysis import clean_text
+from cipher_triage import SOLVERS, classify, extract_features
+
+# Default directory of the result cache
+CACHE_DIR = '.cryptanalysis_cache'
+
+
+def _to_json(value):
+    """Convert solver output (tuples, NumPy scalars and arrays) to JSON types"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    return value
+
+
+def _run_solver(solver, ciphertext, options):
+    """Worker entry point: run one solver and return JSON-ready output"""
+    return _to_json(SOLVERS[solver](ciphertext, **options))
+
+
+class ResultCache:
+    """On-disk JSON store of solver results, one file per key"""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(solver, ciphertext, options):
+        """SHA-256 of the solver name, its options and the cleaned ciphertext"""
+        payload = json.dumps([solver, options, clean_text(ciphertext)], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def get(self, key):
+        """Cached result, or None"""
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, result):
+        """Store a result; written to a temporary file and renamed into place"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+
+
+class Job:
+    """One submitted ciphertext; result is available once done"""
+
+    def __init__(self, index, solver, ciphertext, future, cached=False):
+        self.index = index
+        self.solver = solver
+        self.ciphertext = ciphertext
+        self.future = future
+        self.cached = cached
+
+    def done(self):
+        return self.future.done()
+
+    def cancelled(self):
+        return self.future.cancelled()
+
+    def cancel(self):
+        """Cancel the job if it has not started; returns True on success"""
+        return self.future.cancel()
+
+    @property
+    def result(self):
+        """Ranked solver output (blocks until the job is finished)"""
+        return self.future.result()
+
+    @property
+    def best(self):
+        """Best-ranked candidate, or None if the solver found nothing"""
+        result = self.result
+        return result[0] if result else None
+
+
+class JobScheduler:
+    """
+    Bounded process pool for solver jobs with caching, progress and
+    cancellation. solver names are the keys of cipher_triage.SOLVERS, or
+    'auto' to classify each ciphertext first (in one batch) and use the
+    solver of its family.
+    """
+
+    def __init__(self, workers=None, cache_dir=CACHE_DIR):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.cache = ResultCache(cache_dir) if cache_dir else None
+        # key -> Future of a job that is queued or running
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def submit(self, solver, ciphertext, **options):
+        """Submit one ciphertext; returns a Job"""
+        return self.submit_many(solver, [ciphertext], **options)[0]
+
+    def submit_many(self, solver, ciphertexts, **options):
+        """Submit a batch of ciphertexts; returns one Job per ciphertext, in order"""
+        if solver == 'auto':
+            solvers = list(classify(extract_features(ciphertexts)))
+        else:
+            solvers = [solver] * len(ciphertexts)
+        jobs = []
+        for index, (name, text) in enumerate(zip(solvers, ciphertexts)):
+            jobs.append(self._submit(index, name, text, options))
+        return jobs
+
+    def _submit(self, index, solver, ciphertext, options):
+        if solver not in SOLVERS:
+            future = Future()
+            future.set_result([])
+            return Job(index, solver, ciphertext, future)
+        key = ResultCache.key(solver, ciphertext, options)
+        if self.cache is not None:
+            result = self.cache.get(key)
+            if result is not None:
+                future = Future()
+                future.set_result(result)
+                return Job(index, solver, ciphertext, future, cached=True)
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is None:
+                future = self.pool.submit(_run_solver, solver, ciphertext, options)
+                self.in_flight[key] = future
+                future.add_done_callback(lambda f, key=key: self._finished(key, f))
+        return Job(index, solver, ciphertext, future)
+
+    def _finished(self, key, future):
+        with self.lock:
+            self.in_flight.pop(key, None)
+        if self.cache is not None and not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+
+    def as_completed(self, jobs, on_progress=None):
+        """
+        Yield jobs as they finish (cached ones first). on_progress(done, total,
+        job) is called for every finished job. Cancelled jobs are skipped.
+        """
+        by_future = {}
+        for job in jobs:
+            by_future.setdefault(job.future, []).append(job)
+        total, done = len(jobs), 0
+        for future in _as_completed(by_future):
+            if future.cancelled():
+                total -= len(by_future[future])
+                continue
+            for job in by_future[future]:
+                done += 1
+                if on_progress is not None:
+                    on_progress(done, total, job)
+                yield job
+
+    def cancel(self, jobs):
+        """Cancel every job that has not started; returns how many were cancelled"""
+        return sum(job.cancel() for job in jobs)
+
+    def shutdown(self, cancel_pending=False):
+        """Stop the pool; with cancel_pending, queued jobs are dropped"""
+        self.pool.shutdown(wait=True, cancel_futures=cancel_pending)
+
+
+if __name__ == '__main__':
+    import tempfile
+    import time
+    from vigenere_cipher import vigenere_encrypt
+    from affine_cipher import affine_encrypt
+
+    message = ("Cryptanalysis of the Vigenere cipher starts by finding the length of the "
+               "keyword Once the length is known every column of the ciphertext is a "
+               "simple Caesar cipher and each of those can be broken by comparing its "
+               "letter frequencies with the frequencies of ordinary English text")
+    ciphertexts = [vigenere_encrypt(message, "LEMON"), affine_encrypt(message, 7, 3),
+                   vigenere_encrypt(message, "LEMON")]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for attempt in ("first run", "cached run"):
+            start = time.perf_counter()
+            with JobScheduler(cache_dir=cache_dir) as scheduler:
+                jobs = scheduler.submit_many('auto', ciphertexts)
+                for job in scheduler.as_completed(
+                        jobs, on_progress=lambda done, total, job: print(f"  {done}/{total}")):
+                    print(f"  #{job.index} {job.solver}: {job.best[0]} {job.best[1][:30]}...")
+            print(f"{attempt}: {time.perf_counter() - start:.2f} seconds")
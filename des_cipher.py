@@ -1,6 +1,7 @@
 from Crypto.Cipher import DES
-from Crypto.Util.Padding import pad, unpad
+from Crypto.Util.Padding import pad
 import binascii
+from block_cipher_utils import CipherContext, pool_for
 
 class DESCipher:
     def __init__(self, key):
@@ -9,42 +10,48 @@ class DESCipher:
         if len(key) != 8:
             raise ValueError("Key must be 8 bytes long")
         self.key = key
+        self._pool = None
 
+    def _contexts(self):
+        """Pool of reusable cipher contexts for the current key"""
+        self._pool = pool_for(self._pool, DES, self.key)
+        return self._pool
+
+    # Binary API: any buffer-protocol input (bytes, bytearray, memoryview,
+    # mmap); with output=, results go into that writable buffer and the byte
+    # count is returned instead of bytes
+    def encrypt_bytes(self, data, output=None):
+        """Encrypt bytes using DES in ECB mode (PKCS#7 padded)"""
+        return self._contexts().run(CipherContext.encrypt_ecb, data, output)
+
+    def decrypt_bytes(self, data, output=None):
+        """Decrypt bytes using DES in ECB mode"""
+        return self._contexts().run(CipherContext.decrypt_ecb, data, output)
+
+    def encrypt_cbc_bytes(self, data, iv, output=None):
+        """Encrypt bytes using DES in CBC mode (PKCS#7 padded)"""
+        return self._contexts().run(CipherContext.encrypt_cbc, data, iv, output)
+
+    def decrypt_cbc_bytes(self, data, iv, output=None):
+        """Decrypt bytes using DES in CBC mode"""
+        return self._contexts().run(CipherContext.decrypt_cbc, data, iv, output)
+
+    # String API: text in, hex out (wrappers over the binary API)
     def encrypt(self, plaintext):
         """Encrypt using DES in ECB mode"""
-        # Create cipher object and encrypt the data
-        cipher = DES.new(self.key, DES.MODE_ECB)
-        # Pad the plaintext to be multiple of 8 bytes
-        padded_text = pad(plaintext.encode(), DES.block_size)
-        # Encrypt and return hex representation
-        encrypted_text = cipher.encrypt(padded_text)
-        return binascii.hexlify(encrypted_text).decode('utf-8')
+        return binascii.hexlify(self.encrypt_bytes(plaintext.encode())).decode('utf-8')
 
     def decrypt(self, ciphertext):
         """Decrypt using DES in ECB mode"""
-        # Create cipher object
-        cipher = DES.new(self.key, DES.MODE_ECB)
-        # Convert hex string to bytes
-        encrypted_data = binascii.unhexlify(ciphertext)
-        # Decrypt and unpad
-        decrypted_data = cipher.decrypt(encrypted_data)
-        unpadded_text = unpad(decrypted_data, DES.block_size)
-        return unpadded_text.decode('utf-8')
+        return self.decrypt_bytes(binascii.unhexlify(ciphertext)).decode('utf-8')
 
     def encrypt_cbc(self, plaintext, iv):
         """Encrypt using DES in CBC mode"""
-        cipher = DES.new(self.key, DES.MODE_CBC, iv)
-        padded_text = pad(plaintext.encode(), DES.block_size)
-        encrypted_text = cipher.encrypt(padded_text)
-        return binascii.hexlify(encrypted_text).decode('utf-8')
+        return binascii.hexlify(self.encrypt_cbc_bytes(plaintext.encode(), iv)).decode('utf-8')
 
     def decrypt_cbc(self, ciphertext, iv):
         """Decrypt using DES in CBC mode"""
-        cipher = DES.new(self.key, DES.MODE_CBC, iv)
-        encrypted_data = binascii.unhexlify(ciphertext)
-        decrypted_data = cipher.decrypt(encrypted_data)
-        unpadded_text = unpad(decrypted_data, DES.block_size)
-        return unpadded_text.decode('utf-8')
+        return self.decrypt_cbc_bytes(binascii.unhexlify(ciphertext), iv).decode('utf-8')
 
 # Example usage
 if __name__ == "__main__":
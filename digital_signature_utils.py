@@ -22,6 +22,8 @@ import hashlib
 import random
 from typing import Tuple, Any
 
+from modular_arithmetic import mod_inverse
+
 # ---------- Helpers ----------
 MASK_1024 = (1 << 1024) - 1
 
@@ -57,19 +59,6 @@ def rsa_verify(message: bytes, sig_hex: str, public_key: Tuple[int, int]) -> boo
 # private: x
 # signature: (r, s)
 
-def mod_inverse(a: int, m: int) -> int:
-    """Modular inverse using extended gcd"""
-    def egcd(a, b):
-        if a == 0:
-            return (b, 0, 1)
-        g, y, x = egcd(b % a, a)
-        return (g, x - (b // a) * y, y)
-    g, x, _ = egcd(a % m, m)
-    if g != 1:
-        raise ValueError('modular inverse does not exist')
-    return x % m
-
-
 def elgamal_sign(message: bytes, p: int, g: int, x: int) -> Tuple[int, int]:
     """Return (r, s) signature. x is private key, public y = g^x mod p."""
     h = sha256_int(message) % (p - 1)
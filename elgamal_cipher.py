@@ -1,6 +1,7 @@
 import random
 import math
 import time
+from modular_arithmetic import mod_inverse, batch_inverse
 
 def is_prime(n):
     """Check if a number is prime"""
@@ -11,21 +12,6 @@ def is_prime(n):
             return False
     return True
 
-def mod_inverse(a, m):
-    """Find modular multiplicative inverse"""
-    def extended_gcd(a, b):
-        if a == 0:
-            return b, 0, 1
-        gcd, x1, y1 = extended_gcd(b % a, a)
-        x = y1 - (b // a) * x1
-        y = x1
-        return gcd, x, y
-
-    gcd, x, _ = extended_gcd(a, m)
-    if gcd != 1:
-        raise ValueError("Modular inverse does not exist")
-    return (x % m + m) % m
-
 class ElGamalCipher:
     def __init__(self, key_size=256):
         """Initialize ElGamal with specified key size"""
@@ -99,8 +85,23 @@ class ElGamalCipher:
         # Calculate m = c2 * s^(-1) mod p
         s_inv = mod_inverse(s, self.p)
         m = (c2 * s_inv) % self.p
-        
-        # Try to convert back to string
+        return self._decode(m)
+
+    def decrypt_many(self, ciphertexts, private_key=None):
+        """
+        Decrypt a list of (c1, c2) ciphertexts. All the s^(-1) values are
+        found with one modular inversion (Montgomery batch inversion).
+        """
+        if private_key is None:
+            private_key = self.x
+        shared = [pow(c1, private_key, self.p) for c1, _ in ciphertexts]
+        inverses = batch_inverse(shared, self.p)
+        return [self._decode((c2 * s_inv) % self.p)
+                for (_, c2), s_inv in zip(ciphertexts, inverses)]
+
+    @staticmethod
+    def _decode(m):
+        """Try to convert the message integer back to a string"""
         try:
             return m.to_bytes((m.bit_length() + 7) // 8, 'big').decode()
         except:
@@ -1,10 +1,50 @@
 import string
+from functools import lru_cache
 import numpy as np
+from classical_engine import text_to_array, array_to_text, letter_mask
+from modular_arithmetic import mod_inverse
+
+# Number of blocks multiplied per matmul, bounds the temporary arrays
+HILL_SEGMENT_BLOCKS = 1 << 18
 
 def clean_text(text):
     """Remove spaces and convert to uppercase"""
     return ''.join(text.upper().split())
 
+def hill_blocks(values, key_matrix):
+    """
+    Encrypt letter values (uint8 array, 0-25, length a multiple of n).
+    The text is viewed as an (n x blocks) matrix and multiplied by the key in
+    one matmul per segment. float32 is exact here: every dot product is at
+    most n * 25 * 25, far below 2**24.
+    """
+    key = (np.asarray(key_matrix, dtype=np.int64) % 26).astype(np.float32)
+    n = len(key)
+    blocks = values.reshape(-1, n)
+    out = np.empty_like(blocks)
+    for start in range(0, len(blocks), HILL_SEGMENT_BLOCKS):
+        segment = blocks[start:start + HILL_SEGMENT_BLOCKS].astype(np.float32)
+        # (blocks x n) @ K^T is the row-major form of K @ (n x blocks)
+        out[start:start + HILL_SEGMENT_BLOCKS] = np.fmod(segment @ key.T, 26)
+    return out.reshape(-1)
+
+def hill_encrypt_batch(arr, offsets, key_matrix):
+    """
+    Hill-encrypt packed messages (uint8 letters, message i at
+    arr[offsets[i]:offsets[i+1]]). Each message is padded with 'X' to whole
+    blocks and all blocks are encrypted together. Returns (arr, offsets).
+    """
+    n = len(key_matrix)
+    if not letter_mask(arr).all():
+        raise ValueError("Hill cipher can only encrypt letters")
+    lengths = np.diff(offsets)
+    new_offsets = np.concatenate([[0], np.cumsum(lengths + (-lengths % n))])
+    padded = np.full(new_offsets[-1], ord('X'), dtype=np.uint8)
+    # Scatter every message to the start of its padded slot
+    ids = np.repeat(np.arange(len(lengths)), lengths)
+    padded[np.arange(len(arr)) - offsets[:-1][ids] + new_offsets[:-1][ids]] = arr
+    return hill_blocks(padded - 65, key_matrix) + 65, new_offsets
+
 def hill_encrypt(plaintext, key_matrix):
     """
     Encrypt using Hill cipher
@@ -12,44 +52,66 @@ def hill_encrypt(plaintext, key_matrix):
     plaintext = "HELLO"
     key_matrix = np.array([[3, 3], [2, 7]])
     """
-    alphabet = string.ascii_uppercase
     plaintext = clean_text(plaintext)
     n = len(key_matrix)
+    arr = text_to_array(plaintext)
+    if not letter_mask(arr).all():
+        raise ValueError("Hill cipher can only encrypt letters")
     
-    # Pad plaintext if necessary
-    if len(plaintext) % n != 0:
-        plaintext += 'X' * (n - (len(plaintext) % n))
-    
-    ciphertext = ''
-    # Process n characters at a time
-    for i in range(0, len(plaintext), n):
-        block = plaintext[i:i+n]
-        # Convert block to vector of numbers
-        vector = np.array([alphabet.index(c) for c in block])
-        # Matrix multiplication
-        result = np.dot(key_matrix, vector) % 26
-        # Convert back to letters
-        ciphertext += ''.join(alphabet[int(x)] for x in result)
+    # Pad plaintext with 'X' to a whole number of blocks
+    padding = -len(arr) % n
+    values = np.concatenate([arr, np.full(padding, ord('X'), dtype=np.uint8)]) - 65
     
-    return ciphertext
+    # Encrypt all blocks at once and convert back to letters
+    return array_to_text(hill_blocks(values, key_matrix) + 65)
+
+def gauss_jordan_mod(rows, pivots, modulus):
+    """
+    Row-reduce an integer matrix (list of rows) modulo modulus so that the
+    first `pivots` columns become the identity in the top rows.
+    Works for composite moduli: each pivot is built with Euclid-style row
+    operations and must end up invertible mod modulus.
+    """
+    rows = [[x % modulus for x in row] for row in rows]
+    for col in range(pivots):
+        # Euclid on the column moves gcd(column) into the pivot row
+        for r in range(col + 1, len(rows)):
+            while rows[r][col]:
+                q = rows[col][col] // rows[r][col]
+                rows[col] = [(a - q * b) % modulus for a, b in zip(rows[col], rows[r])]
+                rows[col], rows[r] = rows[r], rows[col]
+        try:
+            inv = mod_inverse(rows[col][col], modulus)
+        except ValueError:
+            raise ValueError(f"Matrix is not invertible mod {modulus}") from None
+        rows[col] = [(a * inv) % modulus for a in rows[col]]
+        # Clear the column in every other row
+        for r in range(len(rows)):
+            factor = rows[r][col]
+            if r != col and factor:
+                rows[r] = [(a - factor * b) % modulus for a, b in zip(rows[r], rows[col])]
+    return rows
+
+@lru_cache(maxsize=128)
+def _cached_inverse(matrix, modulus):
+    """Inverse of a matrix given as a tuple of row tuples, cached per key"""
+    n = len(matrix)
+    rows = [list(row) + [int(i == j) for j in range(n)] for i, row in enumerate(matrix)]
+    rows = gauss_jordan_mod(rows, n, modulus)
+    return tuple(tuple(row[n:]) for row in rows[:n])
 
 def matrix_mod_inverse(matrix, modulus):
-    """Find the modular multiplicative inverse of a matrix"""
-    # This is a simplified version - for a complete implementation,
-    # you would need to handle all edge cases
-    det = int(round(np.linalg.det(matrix)))
-    det_inv = pow(det, -1, modulus)
-    adj = np.round(det * np.linalg.inv(matrix)).astype(int)
-    return (det_inv * adj % modulus)
+    """Find the modular multiplicative inverse of a matrix (exact integer Gauss-Jordan)"""
+    key = tuple(tuple(int(x) for x in row) for row in np.asarray(matrix))
+    return np.array(_cached_inverse(key, modulus), dtype=np.int64)
 
 def hill_decrypt(ciphertext, key_matrix):
     """Decrypt using inverse of key matrix"""
-    # Note: This is a basic implementation and might not work for all cases
     try:
         inv_matrix = matrix_mod_inverse(key_matrix, 26)
-        return hill_encrypt(ciphertext, inv_matrix)
-    except:
+    except ValueError:
         return "Error: Could not find inverse matrix"
+    return hill_encrypt(ciphertext, inv_matrix)
 
 # Example usage
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 from symmetric_ciphers import SymmetricCiphers
+from cryptanalysis import recover_key
 import numpy as np
 
 def main():
@@ -87,11 +88,13 @@ def main():
     print("\nExercise 6:")
     print("Affine cipher with known plaintext-ciphertext pair: 'ab' -> 'GL'")
     print("Ciphertext: XPALASXYFGFUKPXUSOGEUTKCDGEXANMGNVS")
-    # We need to solve for the affine cipher parameters (a,b) using the known pair
-    # This would require solving the system of equations:
+    # Solve the system of equations for (a, b):
     # (0*a + b) mod 26 = 6  (for a->G)
     # (1*a + b) mod 26 = 11 (for b->L)
-    # Then use these parameters to decrypt the message
+    a, b = recover_key('affine', "ab", "GL")
+    print(f"Determined keys: a = {a}, b = {b}")
+    plain_text = cipher.affine_cipher_decrypt("XPALASXYFGFUKPXUSOGEUTKCDGEXANMGNVS", a, b)
+    print(f"Decrypted: {plain_text}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
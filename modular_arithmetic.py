@@ -0,0 +1,106 @@
+"""
+modular_arithmetic.py
+
+Shared modular-arithmetic helpers for the classical and public-key ciphers.
+
+- extended_gcd: iterative extended Euclid (no recursion limit for big ints)
+- mod_inverse: a^-1 mod m, raising ValueError when it does not exist
+- mod_inverse_or_none: same, returning None (the classical ciphers' convention)
+- inverse_table: cached table of all inverses for a small modulus (e.g. 26)
+- crt: Chinese Remainder Theorem for pairwise coprime moduli
+- batch_inverse: Montgomery's trick, n inverses for one inversion and
+  about 3n multiplications
+"""
+
+from functools import lru_cache
+from math import gcd
+
+# Moduli up to this size get a precomputed inverse table
+SMALL_MODULUS = 1 << 12
+
+
+def extended_gcd(a, b):
+    """Return (g, x, y) with a*x + b*y = g = gcd(a, b)"""
+    old_r, r = a, b
+    old_x, x = 1, 0
+    old_y, y = 0, 1
+    while r:
+        q = old_r // r
+        old_r, r = r, old_r - q * r
+        old_x, x = x, old_x - q * x
+        old_y, y = y, old_y - q * y
+    return old_r, old_x, old_y
+
+
+@lru_cache(maxsize=64)
+def inverse_table(m):
+    """Tuple t with t[a] = a^-1 mod m, or 0 where a has no inverse"""
+    return tuple(pow(a, -1, m) if gcd(a, m) == 1 else 0 for a in range(m))
+
+
+def mod_inverse(a, m):
+    """Modular inverse of a mod m; raises ValueError if gcd(a, m) != 1"""
+    if 1 < m <= SMALL_MODULUS:
+        inv = inverse_table(m)[a % m]
+        if inv:
+            return inv
+        raise ValueError("Modular inverse does not exist")
+    try:
+        return pow(a, -1, m)
+    except ValueError:
+        raise ValueError("Modular inverse does not exist") from None
+
+
+def mod_inverse_or_none(a, m):
+    """Modular inverse of a mod m, or None if it does not exist"""
+    try:
+        return mod_inverse(a, m)
+    except ValueError:
+        return None
+
+
+def crt(residues, moduli):
+    """
+    Solve x = residues[i] (mod moduli[i]) for pairwise coprime moduli.
+    Returns (x, M) with 0 <= x < M = product of the moduli.
+    """
+    x, M = 0, 1
+    for r, m in zip(residues, moduli):
+        # x + M*t = r (mod m)  ->  t = (r - x) * M^-1 (mod m)
+        t = ((r - x) * mod_inverse(M, m)) % m
+        x += M * t
+        M *= m
+    return x % M, M
+
+
+def batch_inverse(values, m):
+    """
+    Inverses of all values mod m with a single modular inversion
+    (Montgomery's trick): prefix products, one inverse of the total, then a
+    backward pass. Raises ValueError if any value has no inverse.
+    """
+    values = [v % m for v in values]
+    if not values:
+        return []
+    prefix = [0] * len(values)
+    acc = 1
+    for i, v in enumerate(values):
+        acc = acc * v % m
+        prefix[i] = acc
+    inv = mod_inverse(acc, m)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        # inv = (v_0 * ... * v_i)^-1 here
+        result[i] = inv * prefix[i - 1] % m
+        inv = inv * values[i] % m
+    result[0] = inv
+    return result
+
+
+if __name__ == '__main__':
+    print("extended_gcd(240, 46) =", extended_gcd(240, 46))
+    print("mod_inverse(7, 26) =", mod_inverse(7, 26))
+    print("inverse_table(26) =", inverse_table(26))
+    print("crt([2, 3, 2], [3, 5, 7]) =", crt([2, 3, 2], [3, 5, 7]))
+    p = (1 << 127) - 1
+    print("batch_inverse mod 2^127 - 1:", batch_inverse([2, 3, 5], p))
@@ -1,16 +1,14 @@
-import string
+from classical_engine import multiplicative_table
+# mod_inverse used to be defined here; it is kept as a re-export of the
+# shared helper (None when there is no inverse) for existing importers
+from modular_arithmetic import mod_inverse_or_none as mod_inverse
+
+__all__ = ['clean_text', 'mod_inverse', 'multiplicative_encrypt', 'multiplicative_decrypt']
 
 def clean_text(text):
     """Remove spaces and convert to uppercase"""
     return ''.join(text.upper().split())
 
-def mod_inverse(a, m):
-    """Find modular multiplicative inverse"""
-    for x in range(1, m):
-        if ((a % m) * (x % m)) % m == 1:
-            return x
-    return None
-
 def multiplicative_encrypt(plaintext, key):
     """
     Encrypt using multiplicative cipher
@@ -18,29 +16,14 @@ def multiplicative_encrypt(plaintext, key):
     plaintext = "HELLO"
     key = 7
     """
-    alphabet = string.ascii_uppercase
     plaintext = clean_text(plaintext)
-    ciphertext = ''
-    
-    # Check if key has multiplicative inverse
-    if mod_inverse(key, 26) is None:
-        raise ValueError("Key must have a multiplicative inverse in Z26")
-    
-    for char in plaintext:
-        if char in alphabet:
-            # Multiply the position by key
-            idx = (alphabet.index(char) * key) % 26
-            ciphertext += alphabet[idx]
-        else:
-            ciphertext += char
-    return ciphertext
+    # Multiply every letter position by key using a cached translation table
+    return plaintext.translate(multiplicative_table(key))
 
 def multiplicative_decrypt(ciphertext, key):
     """Decrypt using multiplicative inverse of key"""
-    inv_key = mod_inverse(key, 26)
-    if inv_key is None:
-        raise ValueError("Key must have a multiplicative inverse in Z26")
-    return multiplicative_encrypt(ciphertext, inv_key)
+    # The decryption table already applies the inverse of key
+    return clean_text(ciphertext).translate(multiplicative_table(key, decrypt=True))
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+"""
+ngram_model.py
+
+Compiled English n-gram language model for the cryptanalysis solvers.
+
+build_ngram_model() streams a text corpus once and writes the log-probability
+of every n-gram (26^n little-endian float32 values, indexed by the n-gram read
+as a base-26 number, AAAA = 0) to a raw binary file. load_ngram_model() opens
+that file with np.memmap, so the operating system's page cache holds a single
+copy shared by every process, and opening it costs no parsing.
+
+Build the default quadgram model once:
+    python ngram_model.py corpus1.txt corpus2.txt
+
+Then:
+    table = load_ngram_model()          # memmap of 26^4 float32
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# Default location of the compiled quadgram model (next to this file)
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  'english_quadgrams.bin')
+
+MODEL_DTYPE = np.dtype('<f4')
+
+# Bytes of corpus read per chunk while counting
+READ_SIZE = 16 << 20
+
+# Log-probability of an n-gram never seen in the corpus is log(FLOOR / total)
+FLOOR = 0.01
+
+# Maps every byte to its letter value (0-25), or 255 for non-letters
+_LETTER_VALUES = np.full(256, 255, dtype=np.uint8)
+_LETTER_VALUES[65:91] = np.arange(26)
+_LETTER_VALUES[97:123] = np.arange(26)
+
+
+def _letter_runs(chunk):
+    """Letter values of a bytes chunk with every non-letter removed"""
+    values = _LETTER_VALUES[np.frombuffer(chunk, dtype=np.uint8)]
+    return values[values != 255].astype(np.int64)
+
+
+def count_ngrams(paths, n=4):
+    """
+    Count the n-grams of the letters in the given corpus files. Non-letters
+    are skipped, so n-grams run across spaces and punctuation (as they do in
+    cleaned ciphertext). Returns an int64 array of 26^n counts.
+    """
+    counts = np.zeros(26 ** n, dtype=np.int64)
+    for path in paths:
+        # The last n-1 letters of a chunk start n-grams that end in the next one
+        carry = np.empty(0, dtype=np.int64)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(READ_SIZE)
+                if not chunk:
+                    break
+                values = np.concatenate([carry, _letter_runs(chunk)])
+                width = len(values) - n + 1
+                if width > 0:
+                    idx = np.zeros(width, dtype=np.int64)
+                    for k in range(n):
+                        idx = idx * 26 + values[k:k + width]
+                    counts += np.bincount(idx, minlength=26 ** n)
+                carry = values[-(n - 1):] if n > 1 else values[:0]
+    return counts
+
+
+def log_probabilities(counts):
+    """Natural log-probabilities from n-gram counts, with a floor for unseen n-grams"""
+    total = counts.sum()
+    if not total:
+        raise ValueError("Corpus contains no n-grams")
+    with np.errstate(divide='ignore'):
+        table = np.log(counts / total)
+    table[counts == 0] = np.log(FLOOR / total)
+    return table.astype(MODEL_DTYPE)
+
+
+def build_ngram_model(paths, dst_path=DEFAULT_MODEL_PATH, n=4):
+    """
+    Compile the corpus files into an n-gram model file at dst_path.
+    The file is written to a temporary name and renamed into place, so a
+    process that opens the model never sees a partly written file.
+    Returns dst_path.
+    """
+    table = log_probabilities(count_ngrams(paths, n))
+    tmp_path = dst_path + '.tmp'
+    table.tofile(tmp_path)
+    os.replace(tmp_path, dst_path)
+    load_ngram_model.cache_clear()
+    return dst_path
+
+
+@lru_cache(maxsize=8)
+def load_ngram_model(path=DEFAULT_MODEL_PATH):
+    """
+    Open a compiled model read-only as a flat np.memmap of 26^n float32.
+    n is inferred from the file size. Cached, so each process maps a file once.
+    """
+    size = os.path.getsize(path) // MODEL_DTYPE.itemsize
+    if 26 ** _order(size) != size:
+        raise ValueError(f"{path} is not an n-gram model (26^n float32 values)")
+    return np.memmap(path, dtype=MODEL_DTYPE, mode='r', shape=(size,))
+
+
+def _order(size):
+    n = 1
+    while 26 ** n < size:
+        n += 1
+    return n
+
+
+def model_order(table):
+    """n for a flat table of 26^n log-probabilities"""
+    return _order(len(table))
+
+
+def ngram_score(values, table):
+    """Mean n-gram log-probability of an array of letter values (0-25)"""
+    n = model_order(table)
+    width = len(values) - n + 1
+    if width <= 0:
+        return float('-inf')
+    idx = np.zeros(width, dtype=np.int64)
+    for k in range(n):
+        idx = idx * 26 + values[k:k + width]
+    return float(np.asarray(table)[idx].mean())
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Compile a corpus into an n-gram model file')
+    parser.add_argument('corpus', nargs='+', help='plain-text corpus files')
+    parser.add_argument('-o', '--output', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('-n', type=int, default=4, help='n-gram length (default: quadgrams)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = build_ngram_model(args.corpus, args.output, args.n)
+    print(f"Wrote {path} ({os.path.getsize(path)} bytes) in "
+          f"{time.perf_counter() - start:.2f} seconds")
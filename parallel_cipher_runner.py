@@ -0,0 +1,282 @@
+"""
+parallel_cipher_runner.py
+
+Multi-core runner for the classical ciphers on large ASCII text files.
+
+The file is loaded once into a multiprocessing.shared_memory block; worker
+processes attach to it by name and read/write their chunk in place, so chunk
+data is never pickled. The output is identical to running the matching
+SymmetricCiphers method (or transposition_cipher function) on the whole file.
+
+Two passes are made:
+1. Workers clean their chunk in place (drop whitespace, uppercase) and report
+   its new length and statistics; the parent compacts the chunks.
+2. The parent computes every chunk's key phase from those statistics
+   (Vigenere key index, autokey previous letter, Hill block alignment,
+   transposition segment boundaries) and workers encrypt the chunks into a
+   second shared block, which is written out in order.
+
+Example:
+    run_parallel('vigenere', 'corpus.txt', 'corpus.enc', 'DOLLARS')
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from classical_engine import (affine_bytes_table, keyword_shifts, vigenere_array,
+                              autokey_letters, autokey_encrypt_values,
+                              autokey_decrypt_values, letter_mask)
+from hill_cipher import hill_blocks, matrix_mod_inverse
+from transposition_cipher import create_key_order, decrypt_index
+
+# Bytes per chunk handed to a worker
+CHUNK_SIZE = 16 << 20
+
+# ASCII characters removed by clean_text (str.split() whitespace)
+WHITESPACE = b'\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f '
+UPPER_TABLE = bytes.maketrans(b'abcdefghijklmnopqrstuvwxyz', b'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+CIPHERS = ('additive', 'multiplicative', 'affine', 'vigenere', 'autokey', 'hill',
+           'transposition')
+
+
+# ---------- worker side ----------
+
+def _attach(name, size):
+    """Attach to a shared block and view it as a uint8 array"""
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray((size,), dtype=np.uint8, buffer=shm.buf)
+
+
+def _clean_chunk(name, size, start, end):
+    """Clean [start, end) in place; return (length, letters, alternating letter sum)"""
+    shm, buf = _attach(name, size)
+    try:
+        cleaned = buf[start:end].tobytes().translate(UPPER_TABLE, WHITESPACE)
+        chunk = np.frombuffer(cleaned, dtype=np.uint8)
+        buf[start:start + len(chunk)] = chunk
+        mask = letter_mask(chunk)
+        values = np.where(mask, chunk.astype(np.int64) - 65, 0)
+        # sum of (-1)^j * value_j, j counted from the chunk start
+        alternating = int(values[0::2].sum() - values[1::2].sum())
+        return len(chunk), int(mask.sum()), alternating
+    finally:
+        del buf
+        shm.close()
+
+
+def _apply(op, src, dst, start, end, params):
+    """Run one cipher operation from src[start:end] into dst"""
+    if op == 'translate':
+        table, = params
+        dst[start:end] = np.frombuffer(src[start:end].tobytes().translate(table),
+                                       dtype=np.uint8)
+    elif op == 'vigenere':
+        shifts, decrypt, offset = params
+        dst[start:end] = src[start:end]
+        vigenere_array(dst[start:end], shifts, decrypt, offset)
+    elif op == 'autokey':
+        key, decrypt, previous_is_letter = params
+        chunk = src[start:end]
+        count = autokey_letters(chunk)
+        if count and not previous_is_letter:
+            raise ValueError("Autokey cipher needs a letter before every letter")
+        values = chunk[:count].astype(np.int64) - 65
+        if decrypt:
+            values = autokey_decrypt_values(values, key)
+        else:
+            values = autokey_encrypt_values(values, key)
+        dst[start:end] = chunk
+        dst[start:start + count] = values + 65
+    elif op == 'hill':
+        matrix, = params
+        if not letter_mask(src[start:end]).all():
+            raise ValueError("Hill cipher can only encrypt letters")
+        dst[start:end] = hill_blocks(src[start:end] - 65, matrix) + 65
+    elif op == 'transposition':
+        order, width, height = params
+        i = np.arange(start, end, dtype=np.int64)
+        dst[start:end] = src[(i % height) * width + order[i // height]]
+    elif op == 'untransposition':
+        keyword, height, out_start = params
+        j = np.arange(start, end, dtype=np.int64)
+        plain = src[decrypt_index(keyword, j, height)]
+        dst[out_start:out_start + len(plain)] = plain
+    else:
+        raise ValueError(f"Unknown operation: {op}")
+
+
+def _encrypt_chunk(op, in_name, out_name, size, start, end, params):
+    """Worker entry point: attach both shared blocks and process one chunk"""
+    shm_in, src = _attach(in_name, size)
+    shm_out, dst = _attach(out_name, size)
+    try:
+        _apply(op, src, dst, start, end, params)
+    finally:
+        # Views must be released before the blocks can be closed
+        del src, dst
+        shm_in.close()
+        shm_out.close()
+
+
+# ---------- parent side ----------
+
+def _boundaries(length, chunk_size):
+    return [(s, min(s + chunk_size, length)) for s in range(0, length, chunk_size)]
+
+
+def _clean_and_compact(pool, name, size, buf, length, chunk_size):
+    """Pass 1: clean chunks in parallel, then compact them to the buffer front"""
+    chunks = _boundaries(length, chunk_size)
+    futures = [pool.submit(_clean_chunk, name, size, s, e) for s, e in chunks]
+    stats = [f.result() for f in futures]
+    offsets = [0]
+    for (start, _), (n, _, _) in zip(chunks, stats):
+        # numpy handles the overlapping move (destination is never past source)
+        buf[offsets[-1]:offsets[-1] + n] = buf[start:start + n]
+        offsets.append(offsets[-1] + n)
+    return offsets, stats
+
+
+def _plan(cipher, key, decrypt, buf, offsets, stats, chunk_size):
+    """Compute (op, [(start, end, params)], output length) for pass 2"""
+    total = offsets[-1]
+    spans = list(zip(offsets[:-1], offsets[1:]))
+    if cipher in ('additive', 'multiplicative', 'affine'):
+        if cipher == 'additive':
+            mult, add = 1, key[0] % 26
+        elif cipher == 'multiplicative':
+            mult, add = key[0] % 26, 0
+        else:
+            mult, add = key[0] % 26, key[1] % 26
+        table = affine_bytes_table(mult, add, decrypt)
+        return 'translate', [(s, e, (table,)) for s, e in spans], total
+    if cipher == 'vigenere':
+        shifts = keyword_shifts(key[0])
+        letters_before = np.concatenate([[0], np.cumsum([st[1] for st in stats])])
+        return 'vigenere', [(s, e, (shifts, decrypt, int(letters_before[i]) % len(shifts)))
+                            for i, (s, e) in enumerate(spans)], total
+    if cipher == 'autokey':
+        tasks = []
+        # Alternating sum of all letters before the chunk, in global parity
+        alternating = 0
+        for (s, e), (_, _, local) in zip(spans, stats):
+            if s == 0:
+                shift, previous_is_letter = key[0], True
+            else:
+                previous_is_letter = bool(65 <= buf[s - 1] <= 90)
+                if decrypt:
+                    # p_(s-1) = (-1)^(s-1) * (S_(s-1) - key)
+                    sign = -1 if (s - 1) % 2 else 1
+                    shift = (sign * (alternating - key[0])) % 26
+                else:
+                    shift = int(buf[s - 1]) - 65
+            tasks.append((s, e, (shift, decrypt, previous_is_letter)))
+            alternating += -local if s % 2 else local
+        return 'autokey', tasks, total
+    if cipher == 'hill':
+        matrix = np.asarray(key[0])
+        n = len(matrix)
+        if decrypt:
+            matrix = matrix_mod_inverse(matrix, 26)
+        padded = total + (-total % n)
+        buf[total:padded] = ord('X')
+        # Move every chunk boundary up to the next block boundary
+        cuts = sorted({min(-(-o // n) * n, padded) for o in offsets} | {padded})
+        return 'hill', [(s, e, (matrix,)) for s, e in zip(cuts[:-1], cuts[1:]) if e > s], padded
+    if cipher == 'transposition':
+        keyword = key[0]
+        width = len(keyword)
+        if decrypt:
+            length = total // width * width
+            height = length // width
+            read = np.zeros(width, dtype=np.int64)
+            read[create_key_order(keyword)] = 1
+            valid = np.concatenate([[0], np.cumsum(read)])
+
+            def kept(j):
+                """Plaintext bytes produced before position j (unread columns skipped)"""
+                return int(j // width * valid[-1] + valid[j % width])
+
+            return 'untransposition', [(s, e, (keyword, height, kept(s)))
+                                       for s, e in _boundaries(length, chunk_size)], kept(length)
+        padded = total + (-total % width)
+        buf[total:padded] = ord('X')
+        order = np.array(create_key_order(keyword), dtype=np.int64)
+        return 'transposition', [(s, e, (order, width, padded // width))
+                                 for s, e in _boundaries(padded, chunk_size)], padded
+    raise ValueError(f"Unsupported cipher: {cipher} (choose from {', '.join(CIPHERS)})")
+
+
+def run_parallel(cipher, src_path, dst_path, *key, decrypt=False, workers=None,
+                 chunk_size=CHUNK_SIZE):
+    """
+    Encrypt (or decrypt) the ASCII text file src_path into dst_path using a
+    process pool. key is passed as to the SymmetricCiphers method, e.g.
+    run_parallel('affine', src, dst, 15, 20). Returns the output length.
+    """
+    length = os.path.getsize(src_path)
+    # Leave room for the Hill / transposition padding after the text
+    size = length + 1 + (len(key[0]) if cipher in ('hill', 'transposition') else 0)
+    blocks = []
+    buf = None
+    try:
+        for _ in range(2):
+            blocks.append(shared_memory.SharedMemory(create=True, size=size))
+        shm_in, shm_out = blocks
+        buf = np.ndarray((size,), dtype=np.uint8, buffer=shm_in.buf)
+        with open(src_path, 'rb') as f:
+            f.readinto(shm_in.buf[:length])
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            if cipher == 'transposition' and decrypt:
+                # Transposition decryption does not clean its input
+                offsets, stats = [0, length], [(length, 0, 0)]
+            else:
+                offsets, stats = _clean_and_compact(pool, shm_in.name, size, buf,
+                                                    length, chunk_size)
+            op, tasks, out_len = _plan(cipher, key, decrypt, buf, offsets, stats, chunk_size)
+            futures = [pool.submit(_encrypt_chunk, op, shm_in.name, shm_out.name, size,
+                                   s, e, params) for s, e, params in tasks]
+            for f in futures:
+                f.result()
+        with open(dst_path, 'wb') as f:
+            f.write(shm_out.buf[:out_len])
+        return out_len
+    finally:
+        # Drop the array before closing the block it points into
+        del buf
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Run a classical cipher over a file on all cores')
+    parser.add_argument('cipher', choices=CIPHERS)
+    parser.add_argument('src')
+    parser.add_argument('dst')
+    parser.add_argument('key', nargs='+', help='key arguments, e.g. DOLLARS or 15 20')
+    parser.add_argument('--decrypt', action='store_true')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.cipher == 'hill':
+        # Row-major n x n matrix, e.g. 3 3 2 7
+        values = [int(k) for k in args.key]
+        n = int(round(len(values) ** 0.5))
+        key = (np.array(values).reshape(n, n),)
+    elif args.cipher in ('vigenere', 'transposition'):
+        key = (args.key[0],)
+    else:
+        key = tuple(int(k) for k in args.key)
+
+    start = time.perf_counter()
+    written = run_parallel(args.cipher, args.src, args.dst, *key,
+                           decrypt=args.decrypt, workers=args.workers)
+    print(f"Wrote {written} bytes in {time.perf_counter() - start:.2f} seconds")
@@ -1,4 +1,7 @@
 import string
+from functools import lru_cache
+import numpy as np
+from classical_engine import text_to_array, array_to_text, letter_mask
 
 def clean_text(text):
     """Remove spaces and convert to uppercase"""
@@ -11,9 +14,9 @@ def create_playfair_matrix(key):
     used_chars = set()
     alphabet = string.ascii_uppercase.replace('J', '')  # I/J combined
     
-    # Fill with key first
+    # Fill with the key letters first (digits and punctuation are skipped)
     for char in key:
-        if char not in used_chars and char != 'J':
+        if char in alphabet and char not in used_chars:
             matrix.append(char)
             used_chars.add(char)
     
@@ -36,6 +39,88 @@ def find_position(matrix, char):
                 return i, j
     return None
 
+class PlayfairCipher:
+    """
+    Key-compiled Playfair cipher.
+    The 5x5 matrix is turned into two 25x25 digraph -> digraph lookup tables
+    (one for encryption, one for decryption), so processing a text is only
+    table lookups on letter arrays.
+    """
+
+    def __init__(self, key):
+        self.matrix = create_playfair_matrix(key)
+        square = np.frombuffer(''.join(''.join(row) for row in self.matrix).encode(),
+                               dtype=np.uint8)
+        # Letter (0-25) -> cell (0-24); J shares the cell of I
+        self.cells = np.full(26, -1, dtype=np.int64)
+        self.cells[square - 65] = np.arange(25)
+        self.cells[ord('J') - 65] = self.cells[ord('I') - 65]
+        self.encrypt_table = self.digraph_table(square, 1)
+        self.decrypt_table = self.digraph_table(square, -1)
+
+    @staticmethod
+    def digraph_table(square, step):
+        """Build the (25, 25, 2) table of output letters for every cell pair"""
+        rows, cols = np.divmod(np.arange(25), 5)
+        r1, c1 = rows[:, None], cols[:, None]
+        r2, c2 = rows[None, :], cols[None, :]
+        same_row = r1 == r2
+        same_col = (c1 == c2) & ~same_row
+        # Rectangle rule by default, then the same row / same column rules
+        out1 = np.where(same_row, r1 * 5 + (c1 + step) % 5,
+                        np.where(same_col, (r1 + step) % 5 * 5 + c1, r1 * 5 + c2))
+        out2 = np.where(same_row, r2 * 5 + (c2 + step) % 5,
+                        np.where(same_col, (r2 + step) % 5 * 5 + c2, r2 * 5 + c1))
+        return np.stack([square[out1], square[out2]], axis=-1)
+
+    def prepare(self, plaintext, final=True):
+        """
+        Split cleaned plaintext into digraphs, returned as a uint8 letter array.
+        A filler 'X' ('Q' after an 'X') separates doubled letters that would
+        share a digraph and completes an odd final letter. With final=False
+        an unpaired last letter is returned as carry for the next chunk.
+        Returns (letters, carry).
+        """
+        arr = text_to_array(clean_text(plaintext).replace('J', 'I'))
+        if not letter_mask(arr).all():
+            raise ValueError("Playfair cipher can only encrypt letters")
+        # Doubled letters split the text into segments; an odd-length segment
+        # leaves its last letter unpaired, so it gets a filler
+        ends = np.flatnonzero(arr[:-1] == arr[1:]) + 1
+        starts = np.concatenate([[0], ends])
+        lengths = np.diff(np.concatenate([starts, [len(arr)]]))
+        odd_ends = (starts + lengths)[lengths % 2 == 1]
+        carry = ''
+        if not final and len(odd_ends) and odd_ends[-1] == len(arr):
+            carry, arr, odd_ends = chr(arr[-1]), arr[:-1], odd_ends[:-1]
+        fillers = np.where(arr[odd_ends - 1] == ord('X'), ord('Q'), ord('X')).astype(np.uint8)
+        return np.insert(arr, odd_ends, fillers), carry
+
+    def _lookup(self, letters, table):
+        """Map a letter array of digraphs through a digraph table"""
+        cells = self.cells[letters.astype(np.int64) - 65].reshape(-1, 2)
+        return array_to_text(table[cells[:, 0], cells[:, 1]].reshape(-1))
+
+    def encrypt_letters(self, letters):
+        """Encrypt a digraph letter array returned by prepare()"""
+        return self._lookup(letters, self.encrypt_table)
+
+    def encrypt(self, plaintext):
+        letters, _ = self.prepare(plaintext)
+        return self.encrypt_letters(letters)
+
+    def decrypt(self, ciphertext):
+        """Decrypt; filler letters inserted during encryption are kept"""
+        arr = text_to_array(clean_text(ciphertext).replace('J', 'I'))
+        if not letter_mask(arr).all() or len(arr) % 2:
+            raise ValueError("Playfair ciphertext must be an even number of letters")
+        return self._lookup(arr, self.decrypt_table)
+
+@lru_cache(maxsize=128)
+def get_playfair_cipher(key):
+    """Return the compiled PlayfairCipher for key (cached per key)"""
+    return PlayfairCipher(key)
+
 def playfair_encrypt(plaintext, key):
     """
     Encrypt using Playfair cipher
@@ -43,41 +128,11 @@ def playfair_encrypt(plaintext, key):
     plaintext = "HELLO"
     key = "KEYWORD"
     """
-    matrix = create_playfair_matrix(key)
-    plaintext = clean_text(plaintext).replace('J', 'I')
-    
-    # If length is odd, append 'X'
-    if len(plaintext) % 2 != 0:
-        plaintext += 'X'
-    
-    # Split into digraphs
-    digraphs = [plaintext[i:i+2] for i in range(0, len(plaintext), 2)]
-    
-    # If digraph has same letters, insert 'X'
-    processed_digraphs = []
-    for d in digraphs:
-        if len(d) == 2 and d[0] == d[1]:
-            processed_digraphs.append(d[0] + 'X')
-            plaintext = d[1] + plaintext[len(processed_digraphs)*2:]
-        else:
-            processed_digraphs.append(d)
-    
-    ciphertext = ''
-    for digraph in processed_digraphs:
-        row1, col1 = find_position(matrix, digraph[0])
-        row2, col2 = find_position(matrix, digraph[1])
-        
-        if row1 == row2:  # Same row
-            ciphertext += matrix[row1][(col1 + 1) % 5]
-            ciphertext += matrix[row2][(col2 + 1) % 5]
-        elif col1 == col2:  # Same column
-            ciphertext += matrix[(row1 + 1) % 5][col1]
-            ciphertext += matrix[(row2 + 1) % 5][col2]
-        else:  # Rectangle
-            ciphertext += matrix[row1][col2]
-            ciphertext += matrix[row2][col1]
-    
-    return ciphertext
+    return get_playfair_cipher(clean_text(key)).encrypt(plaintext)
+
+def playfair_decrypt(ciphertext, key):
+    """Decrypt using Playfair cipher (reverse row/column shifts)"""
+    return get_playfair_cipher(clean_text(key)).decrypt(ciphertext)
 
 def print_matrix(matrix):
     """Print Playfair matrix in readable format"""
@@ -99,4 +154,4 @@ if __name__ == "__main__":
     print(f"Original:  {message}")
     print(f"Key:       {key}")
     print(f"Encrypted: {encrypted}")
-    # Note: Decryption is similar but with reverse rules
\ No newline at end of file
+    print(f"Decrypted: {playfair_decrypt(encrypted, key)}")
\ No newline at end of file
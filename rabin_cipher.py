@@ -2,6 +2,7 @@ import random
 import math
 import time
 from typing import List, Tuple
+from modular_arithmetic import extended_gcd
 
 class RabinCipher:
     def __init__(self, key_size=1024):
@@ -63,13 +64,8 @@ class RabinCipher:
         }
 
     def extended_gcd(self, a: int, b: int) -> Tuple[int, int, int]:
-        """Extended Euclidean Algorithm"""
-        if a == 0:
-            return b, 0, 1
-        gcd, x1, y1 = self.extended_gcd(b % a, a)
-        x = y1 - (b // a) * x1
-        y = x1
-        return gcd, x, y
+        """Extended Euclidean Algorithm (iterative)"""
+        return extended_gcd(a, b)
 
     def encrypt(self, message: int, public_key: int = None) -> int:
         """Encrypt a message using Rabin"""
@@ -1,5 +1,13 @@
 import string
 import numpy as np
+from classical_engine import (additive_table, multiplicative_table, affine_table,
+                              affine_translate, vigenere_transform, autokey_transform,
+                              keyword_shifts, pack_messages, unpack_messages,
+                              vigenere_batch, autokey_batch)
+from hill_cipher import hill_encrypt, hill_encrypt_batch, matrix_mod_inverse
+from playfair_cipher import get_playfair_cipher
+from modular_arithmetic import mod_inverse_or_none
+from parallel_cipher_runner import run_parallel
 
 class SymmetricCiphers:
     def __init__(self):
@@ -9,139 +17,109 @@ class SymmetricCiphers:
         """Remove spaces and convert to uppercase"""
         return ''.join(text.upper().split())
     
+    def encrypt_file(self, cipher, src_path, dst_path, *key, workers=None):
+        """Encrypt a large ASCII text file on all cores, e.g. ('vigenere', src, dst, 'KEY')"""
+        return run_parallel(cipher, src_path, dst_path, *key, workers=workers)
+    
+    def decrypt_file(self, cipher, src_path, dst_path, *key, workers=None):
+        """Decrypt a large ASCII text file on all cores"""
+        return run_parallel(cipher, src_path, dst_path, *key, decrypt=True, workers=workers)
+    
+    # Batch API for many short messages
+    def encrypt_many(self, cipher, messages, *key, as_offsets=False):
+        """
+        Encrypt a list of messages with one key, e.g.
+        encrypt_many('affine', names, 15, 20). The key is validated once and
+        all messages are processed in one vectorized pass over a packed buffer.
+        Returns a list of str, or (text, offsets) with as_offsets=True, where
+        message i is text[offsets[i]:offsets[i+1]].
+        """
+        return self._run_many(cipher, messages, key, False, as_offsets)
+    
+    def decrypt_many(self, cipher, messages, *key, as_offsets=False):
+        """Decrypt a list of messages with one key (see encrypt_many)"""
+        return self._run_many(cipher, messages, key, True, as_offsets)
+    
+    def _run_many(self, cipher, messages, key, decrypt, as_offsets):
+        packed = pack_messages(messages)
+        if packed is None or cipher == 'playfair':
+            # Non-ASCII text, or digraph splitting that is per message:
+            # one call per message, key tables still built only once
+            method = getattr(self, f"{cipher}_cipher_{'decrypt' if decrypt else 'encrypt'}")
+            results = [method(m, *key) for m in messages]
+            if not as_offsets:
+                return results
+            return ''.join(results), np.concatenate([[0], np.cumsum(list(map(len, results)))])
+        arr, offsets = packed
+        if cipher in ('additive', 'multiplicative', 'affine'):
+            if cipher == 'additive':
+                table = additive_table(key[0], decrypt)
+            elif cipher == 'multiplicative':
+                table = multiplicative_table(key[0], decrypt)
+            else:
+                table = affine_table(key[0] % 26, key[1] % 26, decrypt)
+            arr = np.frombuffer(arr.tobytes().decode('ascii').translate(table).encode('ascii'),
+                                dtype=np.uint8)
+        elif cipher == 'vigenere':
+            arr = arr.copy()
+            vigenere_batch(arr, offsets, keyword_shifts(key[0]), decrypt)
+        elif cipher == 'autokey':
+            arr = arr.copy()
+            autokey_batch(arr, offsets, key[0], decrypt)
+        elif cipher == 'hill':
+            matrix = matrix_mod_inverse(key[0], 26) if decrypt else key[0]
+            arr, offsets = hill_encrypt_batch(arr, offsets, matrix)
+        else:
+            raise ValueError(f"Unsupported cipher: {cipher}")
+        if as_offsets:
+            return arr.tobytes().decode('ascii'), offsets
+        return unpack_messages(arr, offsets)
+    
     def mod_inverse(self, a, m):
-        """Find modular multiplicative inverse"""
-        for x in range(1, m):
-            if ((a % m) * (x % m)) % m == 1:
-                return x
-        return None
+        """Find modular multiplicative inverse (None if it does not exist)"""
+        return mod_inverse_or_none(a, m)
 
     # Additive (Caesar) Cipher
     def additive_cipher_encrypt(self, plaintext, key):
         plaintext = self.clean_text(plaintext)
-        ciphertext = ''
-        for char in plaintext:
-            if char in self.alphabet:
-                idx = (self.alphabet.index(char) + key) % 26
-                ciphertext += self.alphabet[idx]
-            else:
-                ciphertext += char
-        return ciphertext
+        return plaintext.translate(additive_table(key))
     
     def additive_cipher_decrypt(self, ciphertext, key):
         return self.additive_cipher_encrypt(ciphertext, -key)
     
     # Multiplicative Cipher
     def multiplicative_cipher_encrypt(self, plaintext, key):
-        if self.mod_inverse(key, 26) is None:
-            raise ValueError("Key must have a multiplicative inverse in Z26")
         plaintext = self.clean_text(plaintext)
-        ciphertext = ''
-        for char in plaintext:
-            if char in self.alphabet:
-                idx = (self.alphabet.index(char) * key) % 26
-                ciphertext += self.alphabet[idx]
-            else:
-                ciphertext += char
-        return ciphertext
+        return plaintext.translate(multiplicative_table(key))
     
     def multiplicative_cipher_decrypt(self, ciphertext, key):
-        inv_key = self.mod_inverse(key, 26)
-        if inv_key is None:
-            raise ValueError("Key must have a multiplicative inverse in Z26")
-        return self.multiplicative_cipher_encrypt(ciphertext, inv_key)
+        ciphertext = self.clean_text(ciphertext)
+        return ciphertext.translate(multiplicative_table(key, decrypt=True))
     
     # Affine Cipher
     def affine_cipher_encrypt(self, plaintext, mult_key, add_key):
-        if self.mod_inverse(mult_key, 26) is None:
-            raise ValueError("Multiplicative key must have an inverse in Z26")
-        plaintext = self.clean_text(plaintext)
-        ciphertext = ''
-        for char in plaintext:
-            if char in self.alphabet:
-                idx = (self.alphabet.index(char) * mult_key + add_key) % 26
-                ciphertext += self.alphabet[idx]
-            else:
-                ciphertext += char
-        return ciphertext
+        return affine_translate(plaintext, mult_key, add_key)
     
     def affine_cipher_decrypt(self, ciphertext, mult_key, add_key):
-        inv_key = self.mod_inverse(mult_key, 26)
-        if inv_key is None:
-            raise ValueError("Multiplicative key must have an inverse in Z26")
-        ciphertext = self.clean_text(ciphertext)
-        plaintext = ''
-        for char in ciphertext:
-            if char in self.alphabet:
-                idx = (inv_key * (self.alphabet.index(char) - add_key)) % 26
-                plaintext += self.alphabet[idx]
-            else:
-                plaintext += char
-        return plaintext
+        return affine_translate(ciphertext, mult_key, add_key, decrypt=True)
     
     # Vigenere Cipher
     def vigenere_cipher_encrypt(self, plaintext, keyword):
         plaintext = self.clean_text(plaintext)
-        keyword = self.clean_text(keyword)
-        ciphertext = ''
-        key_idx = 0
-        
-        for char in plaintext:
-            if char in self.alphabet:
-                shift = self.alphabet.index(keyword[key_idx])
-                idx = (self.alphabet.index(char) + shift) % 26
-                ciphertext += self.alphabet[idx]
-                key_idx = (key_idx + 1) % len(keyword)
-            else:
-                ciphertext += char
-        return ciphertext
+        return vigenere_transform(plaintext, keyword)
     
     def vigenere_cipher_decrypt(self, ciphertext, keyword):
         ciphertext = self.clean_text(ciphertext)
-        keyword = self.clean_text(keyword)
-        plaintext = ''
-        key_idx = 0
-        
-        for char in ciphertext:
-            if char in self.alphabet:
-                shift = self.alphabet.index(keyword[key_idx])
-                idx = (self.alphabet.index(char) - shift) % 26
-                plaintext += self.alphabet[idx]
-                key_idx = (key_idx + 1) % len(keyword)
-            else:
-                plaintext += char
-        return plaintext
+        return vigenere_transform(ciphertext, keyword, decrypt=True)
     
     # Autokey Cipher
     def autokey_cipher_encrypt(self, plaintext, key):
         plaintext = self.clean_text(plaintext)
-        ciphertext = ''
-        for i, char in enumerate(plaintext):
-            if char in self.alphabet:
-                if i == 0:
-                    shift = key
-                else:
-                    shift = self.alphabet.index(plaintext[i-1])
-                idx = (self.alphabet.index(char) + shift) % 26
-                ciphertext += self.alphabet[idx]
-            else:
-                ciphertext += char
-        return ciphertext
+        return autokey_transform(plaintext, key)
     
     def autokey_cipher_decrypt(self, ciphertext, key):
         ciphertext = self.clean_text(ciphertext)
-        plaintext = ''
-        for i, char in enumerate(ciphertext):
-            if char in self.alphabet:
-                if i == 0:
-                    shift = key
-                else:
-                    shift = self.alphabet.index(plaintext[i-1])
-                idx = (self.alphabet.index(char) - shift) % 26
-                plaintext += self.alphabet[idx]
-            else:
-                plaintext += char
-        return plaintext
+        return autokey_transform(ciphertext, key, decrypt=True)
     
     # Playfair Cipher
     def create_playfair_matrix(self, key):
@@ -173,49 +151,14 @@ class SymmetricCiphers:
         return None
     
     def playfair_cipher_encrypt(self, plaintext, key):
-        matrix = self.create_playfair_matrix(key)
-        plaintext = self.clean_text(plaintext).replace('J', 'I')
-        
-        # Prepare text (split into digraphs)
-        if len(plaintext) % 2 != 0:
-            plaintext += 'X'
-        
-        digraphs = [plaintext[i:i+2] for i in range(0, len(plaintext), 2)]
-        ciphertext = ''
-        
-        for digraph in digraphs:
-            row1, col1 = self.find_position(matrix, digraph[0])
-            row2, col2 = self.find_position(matrix, digraph[1])
-            
-            if row1 == row2:  # Same row
-                ciphertext += matrix[row1][(col1 + 1) % 5]
-                ciphertext += matrix[row2][(col2 + 1) % 5]
-            elif col1 == col2:  # Same column
-                ciphertext += matrix[(row1 + 1) % 5][col1]
-                ciphertext += matrix[(row2 + 1) % 5][col2]
-            else:  # Rectangle
-                ciphertext += matrix[row1][col2]
-                ciphertext += matrix[row2][col1]
-        
-        return ciphertext
+        return get_playfair_cipher(self.clean_text(key)).encrypt(plaintext)
+    
+    def playfair_cipher_decrypt(self, ciphertext, key):
+        return get_playfair_cipher(self.clean_text(key)).decrypt(ciphertext)
     
     # Hill Cipher
     def hill_cipher_encrypt(self, plaintext, key_matrix):
-        plaintext = self.clean_text(plaintext)
-        n = len(key_matrix)
-        
-        # Pad plaintext if necessary
-        if len(plaintext) % n != 0:
-            plaintext += 'X' * (n - (len(plaintext) % n))
-        
-        ciphertext = ''
-        for i in range(0, len(plaintext), n):
-            block = plaintext[i:i+n]
-            # Convert block to vector of numbers
-            vector = np.array([self.alphabet.index(c) for c in block])
-            # Matrix multiplication
-            result = np.dot(key_matrix, vector) % 26
-            # Convert back to letters
-            ciphertext += ''.join(self.alphabet[int(x)] for x in result)
-        
-        return ciphertext
\ No newline at end of file
+        return hill_encrypt(plaintext, key_matrix)
+    
+    def hill_cipher_decrypt(self, ciphertext, key_matrix):
+        return hill_encrypt(ciphertext, matrix_mod_inverse(key_matrix, 26))
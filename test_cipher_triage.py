@@ -0,0 +1,29 @@
+import random
+
+from cipher_triage import classify, extract_features
+from transposition_cipher import transposition_encrypt
+
+TEXT = ("It was the best of times it was the worst of times it was the age of wisdom "
+        "it was the age of foolishness it was the epoch of belief it was the epoch of "
+        "incredulity it was the season of light it was the season of darkness it was "
+        "the spring of hope it was the winter of despair we had everything before us "
+        "we had nothing before us we were all going direct to heaven we were all going "
+        "direct the other way in short the period was so far like the present period "
+        "that some of its noisiest authorities insisted on its being received for good "
+        "or for evil in the superlative degree of comparison only there were a king "
+        "with a large jaw and a queen with a plain face on the throne of england there "
+        "were a king with a large jaw and a queen with a fair face on the throne of "
+        "france in both countries it was clearer than crystal to the lords of the state "
+        "preserves of loaves and fishes that things in general were settled for ever")
+LETTERS = ''.join(c for c in TEXT.upper() if c.isalpha())
+
+
+def test_transposition_batch_is_classified_as_transposition():
+    rng = random.Random(0)
+    ciphertexts = []
+    for _ in range(60):
+        start = rng.randrange(len(LETTERS) - 300)
+        keyword = ''.join(rng.sample('ABCDEFGHIJKLMNOPQRSTUVWXYZ', rng.randint(4, 9)))
+        ciphertexts.append(transposition_encrypt(LETTERS[start:start + 300], keyword))
+    families = classify(extract_features(ciphertexts))
+    assert list(families) == ['transposition'] * len(ciphertexts)
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from autokey_cipher import autokey_encrypt, autokey_decrypt
+from classical_streams import AutokeyStream
+
+
+def _feed(stream, text, cuts):
+    bounds = [0] + sorted(cuts) + [len(text)]
+    out = ''.join(stream.update(text[a:b]) for a, b in zip(bounds, bounds[1:]))
+    return out + stream.finalize()
+
+
+def test_autokey_chunk_ending_on_non_letter_then_no_letters():
+    stream = AutokeyStream(7)
+    assert stream.update('AB1') + stream.update('2') == autokey_encrypt('AB12', 7) == 'HB12'
+
+
+@pytest.mark.parametrize('decrypt', [False, True])
+def test_autokey_stream_matches_one_shot_for_any_chunking(decrypt):
+    rng = random.Random(0)
+    one_shot = autokey_decrypt if decrypt else autokey_encrypt
+    for _ in range(200):
+        letters = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.randint(0, 12)))
+        tail = ''.join(rng.choice('0123456789.,!?-') for _ in range(rng.randint(0, 6)))
+        text = letters + tail
+        key = rng.randrange(26)
+        cuts = rng.sample(range(1, len(text)), min(rng.randint(0, 4), max(len(text) - 1, 0)))
+        assert _feed(AutokeyStream(key, decrypt), text, cuts) == one_shot(text, key)
+
+
+def test_autokey_stream_rejects_letter_after_non_letter():
+    stream = AutokeyStream(7)
+    stream.update('AB1')
+    stream.update('2')
+    with pytest.raises(ValueError):
+        stream.update('C')
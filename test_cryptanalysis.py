@@ -0,0 +1,16 @@
+from cryptanalysis import dictionary_attack_vigenere
+from vigenere_cipher import vigenere_encrypt
+
+MESSAGE = ("Cryptanalysis of the Vigenere cipher starts by finding the length of the "
+           "keyword. Once the length is known, every column of the ciphertext is a "
+           "simple Caesar cipher, and each of those can be broken by comparing its "
+           "letter frequencies with the frequencies of ordinary English text.")
+
+
+def test_dictionary_attack_recovers_the_keyword():
+    ciphertext = vigenere_encrypt(MESSAGE, "LEMON")
+    # YRZBA is LEMON shifted by 13, which a letter-offset mistake would pick
+    words = ["YRZBA", "APPLE", "LEMON", "HOUSE", "ORANGE"]
+    results = dictionary_attack_vigenere(ciphertext, words, top_k=1, workers=1)
+    assert results[0][0] == "LEMON"
+    assert results[0][1].startswith("CRYPTANALYSISOFTHEVIGENERECIPHER")
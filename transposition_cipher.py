@@ -1,3 +1,10 @@
+import os
+from functools import lru_cache
+import numpy as np
+
+# Number of output bytes permuted per step by the file-based mode
+BLOCK_SIZE = 1 << 20
+
 def create_key_order(keyword):
     """Create the order of columns based on the keyword"""
     # Convert keyword to numbers based on alphabetical order
@@ -11,6 +18,40 @@ def pad_text(text, width):
         text += 'X' * padding
     return text
 
+def _column_ranks(keyword):
+    """Position of each column in the ciphertext (-1 if never read)"""
+    ranks = np.full(len(keyword), -1, dtype=np.int64)
+    # A repeated keyword letter makes a column appear twice; the later copy
+    # overwrites the earlier one, as in the matrix-based decryption
+    for rank, col in enumerate(create_key_order(keyword)):
+        ranks[col] = rank
+    return ranks
+
+def decrypt_index(keyword, positions, height):
+    """Ciphertext index for each plaintext position (columns never read are dropped)"""
+    width = len(keyword)
+    ranks = _column_ranks(keyword)[positions % width]
+    keep = ranks >= 0
+    return ranks[keep] * height + positions[keep] // width
+
+@lru_cache(maxsize=64)
+def transposition_inverse_permutation(keyword, length):
+    """Gather index for decryption: plaintext = ciphertext[inv]. Cached per (keyword, length)."""
+    inv = decrypt_index(keyword, np.arange(length, dtype=np.int64), length // len(keyword))
+    inv.flags.writeable = False
+    return inv
+
+def _to_codes(text):
+    """Text as an array of character codes (uint8 for ASCII, uint32 otherwise)"""
+    if text.isascii():
+        return np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+def _from_codes(codes):
+    if codes.dtype == np.uint8:
+        return codes.tobytes().decode('ascii')
+    return codes.tobytes().decode('utf-32-le')
+
 def transposition_encrypt(plaintext, keyword):
     """
     Encrypt using columnar transposition cipher
@@ -27,51 +68,55 @@ def transposition_encrypt(plaintext, keyword):
     # Pad plaintext if necessary
     plaintext = pad_text(plaintext, width)
     
-    # Create matrix
-    height = len(plaintext) // width
-    matrix = [[''] * width for _ in range(height)]
-    
-    # Fill matrix row by row
-    for i in range(height):
-        for j in range(width):
-            matrix[i][j] = plaintext[i * width + j]
-    
-    # Get column order from keyword
-    order = create_key_order(keyword)
-    
-    # Read off columns in keyword order
-    ciphertext = ''
-    for col in order:
-        for row in range(height):
-            ciphertext += matrix[row][col]
-    
-    return ciphertext
+    # Read off columns in keyword order: column `col` is the slice [col::width]
+    return ''.join(plaintext[col::width] for col in create_key_order(keyword))
 
 def transposition_decrypt(ciphertext, keyword):
     """Decrypt using columnar transposition cipher"""
     width = len(keyword)
-    height = len(ciphertext) // width
+    length = len(ciphertext) // width * width
     
-    # Get column order
-    order = create_key_order(keyword)
-    
-    # Create empty matrix
-    matrix = [[''] * width for _ in range(height)]
-    
-    # Fill matrix column by column in keyword order
-    pos = 0
-    for col in order:
-        for row in range(height):
-            matrix[row][col] = ciphertext[pos]
-            pos += 1
-    
-    # Read matrix row by row
-    plaintext = ''
-    for row in range(height):
-        for col in range(width):
-            plaintext += matrix[row][col]
-    
-    return plaintext
+    # One gather through the precomputed inverse permutation
+    codes = _to_codes(ciphertext[:length])
+    return _from_codes(codes.take(transposition_inverse_permutation(keyword, length)))
+
+def _open_memmap(path):
+    """Memory-map a file as uint8 (empty files give an empty array)"""
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='r')
+
+def transposition_encrypt_file(src_path, dst_path, keyword, block_size=BLOCK_SIZE):
+    """
+    Encrypt a file block by block through a memory map, without loading it.
+    The file is taken as already cleaned text (no whitespace removal); the
+    output equals transposition_encrypt on the same text.
+    """
+    data = _open_memmap(src_path)
+    width = len(keyword)
+    length = len(data) + (-len(data) % width)
+    height = length // width
+    order = np.array(create_key_order(keyword), dtype=np.int64)
+    with open(dst_path, 'wb') as out:
+        for start in range(0, length, block_size):
+            i = np.arange(start, min(start + block_size, length), dtype=np.int64)
+            src = (i % height) * width + order[i // height]
+            # Positions past the end of the file are the 'X' padding
+            block = np.full(len(i), ord('X'), dtype=np.uint8)
+            inside = src < len(data)
+            block[inside] = data[src[inside]]
+            out.write(block.tobytes())
+
+def transposition_decrypt_file(src_path, dst_path, keyword, block_size=BLOCK_SIZE):
+    """Decrypt a file block by block through a memory map, without loading it"""
+    data = _open_memmap(src_path)
+    width = len(keyword)
+    length = len(data) // width * width
+    height = length // width
+    with open(dst_path, 'wb') as out:
+        for start in range(0, length, block_size):
+            j = np.arange(start, min(start + block_size, length), dtype=np.int64)
+            out.write(data[decrypt_index(keyword, j, height)].tobytes())
 
 # Example usage
 if __name__ == "__main__":
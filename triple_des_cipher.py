@@ -1,6 +1,6 @@
 from Crypto.Cipher import DES3
-from Crypto.Util.Padding import pad, unpad
 import binascii
+from block_cipher_utils import CipherContext, pool_for
 
 class TripleDESCipher:
     def __init__(self, key):
@@ -9,36 +9,48 @@ class TripleDESCipher:
         if len(key) not in [16, 24]:
             raise ValueError("Key must be either 16 or 24 bytes long")
         self.key = key
+        self._pool = None
 
+    def _contexts(self):
+        """Pool of reusable cipher contexts for the current key"""
+        self._pool = pool_for(self._pool, DES3, self.key)
+        return self._pool
+
+    # Binary API: any buffer-protocol input (bytes, bytearray, memoryview,
+    # mmap); with output=, results go into that writable buffer and the byte
+    # count is returned instead of bytes
+    def encrypt_bytes(self, data, output=None):
+        """Encrypt bytes using 3DES in ECB mode (PKCS#7 padded)"""
+        return self._contexts().run(CipherContext.encrypt_ecb, data, output)
+
+    def decrypt_bytes(self, data, output=None):
+        """Decrypt bytes using 3DES in ECB mode"""
+        return self._contexts().run(CipherContext.decrypt_ecb, data, output)
+
+    def encrypt_cbc_bytes(self, data, iv, output=None):
+        """Encrypt bytes using 3DES in CBC mode (PKCS#7 padded)"""
+        return self._contexts().run(CipherContext.encrypt_cbc, data, iv, output)
+
+    def decrypt_cbc_bytes(self, data, iv, output=None):
+        """Decrypt bytes using 3DES in CBC mode"""
+        return self._contexts().run(CipherContext.decrypt_cbc, data, iv, output)
+
+    # String API: text in, hex out (wrappers over the binary API)
     def encrypt(self, plaintext):
         """Encrypt using 3DES in ECB mode"""
-        cipher = DES3.new(self.key, DES3.MODE_ECB)
-        padded_text = pad(plaintext.encode(), DES3.block_size)
-        encrypted_text = cipher.encrypt(padded_text)
-        return binascii.hexlify(encrypted_text).decode('utf-8')
+        return binascii.hexlify(self.encrypt_bytes(plaintext.encode())).decode('utf-8')
 
     def decrypt(self, ciphertext):
         """Decrypt using 3DES in ECB mode"""
-        cipher = DES3.new(self.key, DES3.MODE_ECB)
-        encrypted_data = binascii.unhexlify(ciphertext)
-        decrypted_data = cipher.decrypt(encrypted_data)
-        unpadded_text = unpad(decrypted_data, DES3.block_size)
-        return unpadded_text.decode('utf-8')
+        return self.decrypt_bytes(binascii.unhexlify(ciphertext)).decode('utf-8')
 
     def encrypt_cbc(self, plaintext, iv):
         """Encrypt using 3DES in CBC mode"""
-        cipher = DES3.new(self.key, DES3.MODE_CBC, iv)
-        padded_text = pad(plaintext.encode(), DES3.block_size)
-        encrypted_text = cipher.encrypt(padded_text)
-        return binascii.hexlify(encrypted_text).decode('utf-8')
+        return binascii.hexlify(self.encrypt_cbc_bytes(plaintext.encode(), iv)).decode('utf-8')
 
     def decrypt_cbc(self, ciphertext, iv):
         """Decrypt using 3DES in CBC mode"""
-        cipher = DES3.new(self.key, DES3.MODE_CBC, iv)
-        encrypted_data = binascii.unhexlify(ciphertext)
-        decrypted_data = cipher.decrypt(encrypted_data)
-        unpadded_text = unpad(decrypted_data, DES3.block_size)
-        return unpadded_text.decode('utf-8')
+        return self.decrypt_cbc_bytes(binascii.unhexlify(ciphertext), iv).decode('utf-8')
 
 # Example usage
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-import string
+from classical_engine import vigenere_transform
 
 def clean_text(text):
     """Remove spaces and convert to uppercase"""
@@ -11,45 +11,15 @@ def vigenere_encrypt(plaintext, keyword):
     plaintext = "HELLO"
     keyword = "KEY"
     """
-    alphabet = string.ascii_uppercase
     plaintext = clean_text(plaintext)
-    keyword = clean_text(keyword)
-    ciphertext = ''
-    key_idx = 0
-    
-    for char in plaintext:
-        if char in alphabet:
-            # Get shift from keyword letter
-            shift = alphabet.index(keyword[key_idx])
-            # Apply shift to current character
-            idx = (alphabet.index(char) + shift) % 26
-            ciphertext += alphabet[idx]
-            # Move to next keyword letter
-            key_idx = (key_idx + 1) % len(keyword)
-        else:
-            ciphertext += char
-    return ciphertext
+    # Tile the keyword shifts over the letters and add them in one vectorized pass
+    return vigenere_transform(plaintext, keyword)
 
 def vigenere_decrypt(ciphertext, keyword):
     """Decrypt by shifting in opposite direction"""
-    alphabet = string.ascii_uppercase
     ciphertext = clean_text(ciphertext)
-    keyword = clean_text(keyword)
-    plaintext = ''
-    key_idx = 0
-    
-    for char in ciphertext:
-        if char in alphabet:
-            # Get shift from keyword letter
-            shift = alphabet.index(keyword[key_idx])
-            # Apply reverse shift
-            idx = (alphabet.index(char) - shift) % 26
-            plaintext += alphabet[idx]
-            # Move to next keyword letter
-            key_idx = (key_idx + 1) % len(keyword)
-        else:
-            plaintext += char
-    return plaintext
+    # Subtract the tiled keyword shifts in one vectorized pass
+    return vigenere_transform(ciphertext, keyword, decrypt=True)
 
 # Example usage
 if __name__ == "__main__":